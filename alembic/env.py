@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 # 설정 가져오기
 from app.core.config import settings
-from app.core.database import Base
+from app.core.database import Base, to_sync_url
 from app.models import *  # 모든 모델 import
 
 # this is the Alembic Config object, which provides
@@ -34,8 +34,12 @@ target_metadata = Base.metadata
 
 def get_url():
     """데이터베이스 URL 가져오기"""
+    # 스크립트에서 Config.attributes로 직접 지정한 URL 우선 (scripts/check_query_plans.py 등)
+    if config.attributes.get("url"):
+        return to_sync_url(config.attributes["url"])
     if settings.DATABASE_URL:
-        return settings.DATABASE_URL
+        # 애플리케이션은 async 드라이버를 쓰지만 Alembic은 동기 드라이버로 실행
+        return to_sync_url(settings.DATABASE_URL)
     elif all([settings.DB_HOST, settings.DB_USER, settings.DB_PASSWORD, settings.DB_NAME]):
         return f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}?charset=utf8mb4"
     else:
@@ -73,6 +77,16 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # scripts/migrate.py는 잠금을 잡은 연결을 전달
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     
@@ -0,0 +1,101 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+기존에 Base.metadata.create_all로 생성되던 테이블과 동일한 스키마입니다. (user_provisioning_outbox 추가 이전)
+create_all로 이미 테이블이 만들어진 DB는 이 리비전으로 stamp한 뒤 업그레이드합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('region_code', sa.String(length=10), nullable=True),
+        sa.Column('subscription_status', sa.Enum('FREE', 'PREMIUM', 'VIP', name='subscriptionstatus'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'contents',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('age_rating', sa.String(length=10), nullable=True),
+        sa.Column('like_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_contents_id', 'contents', ['id'])
+    op.create_index('ix_contents_title', 'contents', ['title'])
+
+    op.create_table(
+        'contents_likes',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('contents_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['contents_id'], ['contents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'contents_id', name='unique_user_content_like')
+    )
+    op.create_index('ix_contents_likes_id', 'contents_likes', ['id'])
+    op.create_index('ix_contents_likes_user_id', 'contents_likes', ['user_id'])
+    op.create_index('ix_contents_likes_contents_id', 'contents_likes', ['contents_id'])
+
+    op.create_table(
+        'watch_history',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('content_id', sa.Integer(), nullable=False),
+        sa.Column('last_played_time', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_watch_history_id', 'watch_history', ['id'])
+    op.create_index('ix_watch_history_user_id', 'watch_history', ['user_id'])
+    op.create_index('ix_watch_history_content_id', 'watch_history', ['content_id'])
+
+    op.create_table(
+        'video_assets',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_id', sa.Integer(), nullable=False),
+        sa.Column('video_url', sa.String(length=500), nullable=False),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('resolution', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['content_id'], ['contents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_video_assets_id', 'video_assets', ['id'])
+    op.create_index('ix_video_assets_content_id', 'video_assets', ['content_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('video_assets')
+    op.drop_table('watch_history')
+    op.drop_table('contents_likes')
+    op.drop_table('contents')
+    op.drop_table('users')
@@ -0,0 +1,47 @@
+"""user provisioning outbox
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 09:15:00.000000
+
+Keycloak 사용자 생성 outbox 테이블 (create_all 시절에 모델로 추가된 스키마와 동일)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_provisioning_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=255), nullable=True),
+        sa.Column('last_name', sa.String(length=255), nullable=True),
+        sa.Column('encrypted_password', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'DONE', 'FAILED', name='provisioningstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('keycloak_user_id', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_provisioning_outbox_id', 'user_provisioning_outbox', ['id'])
+    op.create_index('ix_user_provisioning_outbox_user_id', 'user_provisioning_outbox', ['user_id'])
+    op.create_index('ix_user_provisioning_outbox_status', 'user_provisioning_outbox', ['status'])
+    op.create_index('ix_user_provisioning_outbox_next_attempt_at', 'user_provisioning_outbox', ['next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('user_provisioning_outbox')
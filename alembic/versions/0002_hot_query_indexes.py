@@ -0,0 +1,72 @@
+"""composite indexes for hot queries
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18 09:30:00.000000
+
+- watch_history: (user_id, content_id) unique 키와 목록 조회용 (user_id, updated_at, ...) covering 인덱스
+- contents_likes: 컨텐츠별 좋아요 조회용 (contents_id, id, ...) covering 인덱스
+- user_provisioning_outbox: 대기 항목 선점 조회용 (status, next_attempt_at) 인덱스
+
+복합 인덱스의 선두 컬럼과 겹치는 단일 컬럼 인덱스는 삭제합니다.
+(MySQL 외래 키에 필요한 인덱스는 새 복합 인덱스가 대신합니다.)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # unique 키를 만들기 전에 동시 요청으로 생긴 중복 시청기록 정리 (가장 최근에 생성된 행 유지)
+    # MySQL은 삭제 대상 테이블을 서브쿼리에서 직접 참조할 수 없어 파생 테이블로 한 번 감쌈
+    op.execute(sa.text(
+        "DELETE FROM watch_history WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM watch_history GROUP BY user_id, content_id) AS keep_rows"
+        ")"
+    ))
+    op.create_index('uq_watch_history_user_content', 'watch_history', ['user_id', 'content_id'], unique=True)
+    op.create_index(
+        'ix_watch_history_user_updated',
+        'watch_history',
+        ['user_id', 'updated_at', 'id', 'content_id', 'last_played_time']
+    )
+    op.drop_index('ix_watch_history_user_id', table_name='watch_history')
+
+    op.create_index(
+        'ix_contents_likes_contents_id_id',
+        'contents_likes',
+        ['contents_id', 'id', 'user_id', 'created_at']
+    )
+    op.drop_index('ix_contents_likes_contents_id', table_name='contents_likes')
+    # user_id 단독 조회는 unique_user_content_like (user_id, contents_id)가 처리
+    op.drop_index('ix_contents_likes_user_id', table_name='contents_likes')
+
+    op.create_index(
+        'ix_user_provisioning_outbox_status_next',
+        'user_provisioning_outbox',
+        ['status', 'next_attempt_at']
+    )
+    op.drop_index('ix_user_provisioning_outbox_status', table_name='user_provisioning_outbox')
+    op.drop_index('ix_user_provisioning_outbox_next_attempt_at', table_name='user_provisioning_outbox')
+
+
+def downgrade() -> None:
+    op.create_index('ix_user_provisioning_outbox_next_attempt_at', 'user_provisioning_outbox', ['next_attempt_at'])
+    op.create_index('ix_user_provisioning_outbox_status', 'user_provisioning_outbox', ['status'])
+    op.drop_index('ix_user_provisioning_outbox_status_next', table_name='user_provisioning_outbox')
+
+    op.create_index('ix_contents_likes_user_id', 'contents_likes', ['user_id'])
+    op.create_index('ix_contents_likes_contents_id', 'contents_likes', ['contents_id'])
+    op.drop_index('ix_contents_likes_contents_id_id', table_name='contents_likes')
+
+    op.create_index('ix_watch_history_user_id', 'watch_history', ['user_id'])
+    op.drop_index('ix_watch_history_user_updated', table_name='watch_history')
+    op.drop_index('uq_watch_history_user_content', table_name='watch_history')
@@ -0,0 +1,42 @@
+"""striped content like counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00.000000
+
+- content_like_counters: 컨텐츠별 N개 행으로 나눈 좋아요 수 증감 (contents_id, shard)
+  좋아요/취소가 contents 행을 직접 갱신하지 않고 임의의 shard 행만 원자적으로 증감합니다.
+  기존 contents.like_count는 합산 기준값으로 그대로 사용하므로 데이터 이전은 필요 없습니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_like_counters',
+        sa.Column('contents_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['contents_id'], ['contents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('contents_id', 'shard')
+    )
+
+
+def downgrade() -> None:
+    # 합산되지 않은 증감을 contents.like_count에 반영한 뒤 삭제
+    op.execute(sa.text(
+        "UPDATE contents SET like_count = like_count + ("
+        "SELECT COALESCE(SUM(c.count), 0) FROM content_like_counters c WHERE c.contents_id = contents.id"
+        ")"
+    ))
+    op.drop_table('content_like_counters')
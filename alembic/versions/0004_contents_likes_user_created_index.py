@@ -0,0 +1,33 @@
+"""contents_likes (user_id, created_at, contents_id) index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+- contents_likes: 내 좋아요 목록(GET /users/me/likes)용 (user_id, created_at, contents_id) covering 인덱스
+  (created_at, contents_id) keyset 페이지네이션을 인덱스 범위 조회만으로 처리합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+# 인덱스만 추가하므로 적용 전에도 읽기 경로는 동작함 (SCHEMA_CHECK_MODE=readonly)
+read_compatible: bool = True
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_contents_likes_user_created',
+        'contents_likes',
+        ['user_id', 'created_at', 'contents_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contents_likes_user_created', table_name='contents_likes')
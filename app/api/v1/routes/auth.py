@@ -2,24 +2,24 @@
 Authentication API endpoints
 로그인, 로그아웃, 회원가입
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import security
 from app.core.config import settings
 from app.services.auth import auth_service
 from app.services.user_service import user_service
 from app.schemas.user import UserCreate, UserLogin
-from app.schemas.auth import TokenResponse, RegisterResponse
+from app.schemas.auth import TokenResponse, RefreshTokenRequest, RegisterResponse
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     회원가입
     
@@ -53,79 +53,122 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
 
+def _token_response(token_data: dict) -> TokenResponse:
+    """Keycloak 토큰 응답을 TokenResponse로 변환"""
+    return TokenResponse(
+        access_token=token_data["access_token"],
+        token_type="bearer",
+        expires_in=token_data.get("expires_in", 3600),
+        refresh_token=token_data.get("refresh_token"),
+        refresh_expires_in=token_data.get("refresh_expires_in")
+    )
+
+
+def _grant_result(task: asyncio.Task) -> dict:
+    """password grant 결과 확인 (거부/오류 시 HTTPException)"""
+    try:
+        token_data = task.result()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Login failed: {str(e)}"
+        )
+    if token_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Failed to get token from Keycloak"
+        )
+    return token_data
+
+
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """
     로그인
     
+    로컬 비밀번호 검증(bcrypt)과 Keycloak password grant를 동시에 실행합니다.
+    어느 한쪽이라도 실패하면 다른 쪽을 취소하고 즉시 401을 반환하며,
+    토큰은 두 검증이 모두 성공한 경우에만 반환됩니다.
+    
     Args:
         credentials: 로그인 정보 (이메일, 비밀번호)
         db: 데이터베이스 세션
     
     Returns:
-        JWT 액세스 토큰
+        JWT 액세스 토큰 및 refresh_token
     """
     # 데이터베이스에서 사용자 조회 (타임아웃 처리)
     try:
-        user = user_service.get_user_by_email(db, credentials.email)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-        
-        # 비밀번호 검증
-        if not user_service.verify_password(credentials.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-    except HTTPException:
-        raise
+        user = await user_service.get_user_by_email(db, credentials.email)
     except Exception as e:
         # DB 연결 오류 등 기타 예외 처리
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Database connection failed: {str(e)}"
         )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
     
-    # Keycloak에서 토큰 발급
+    # 비밀번호 검증과 Keycloak 토큰 발급을 동시에 실행
+    verify_task = asyncio.ensure_future(
+        user_service.verify_password_async(credentials.password, user.password_hash)
+    )
+    grant_task = asyncio.ensure_future(
+        auth_service.password_grant(credentials.email, credentials.password)
+    )
+    token_data = None
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{auth_service.keycloak_url}/realms/{auth_service.realm}/protocol/openid-connect/token",
-                data={
-                    "grant_type": "password",
-                    "client_id": auth_service.client_id or "backend-client",
-                    "username": credentials.email,
-                    "password": credentials.password,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=10.0
-            )
-            
-            if response.status_code != 200:
+        pending = {verify_task, grant_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # 로컬 검증 실패는 Keycloak 결과와 관계없이 거부
+            if verify_task in done and not verify_task.result():
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Failed to get token from Keycloak"
+                    detail="Invalid email or password"
                 )
-            
-            token_data = response.json()
-            return TokenResponse(
-                access_token=token_data["access_token"],
-                token_type="bearer",
-                expires_in=token_data.get("expires_in", 3600)
-            )
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication failed: {e.response.text}"
-        )
+            if grant_task in done:
+                token_data = _grant_result(grant_task)
+    finally:
+        for task in (verify_task, grant_task):
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # 확인하지 않은 예외가 경고로 남지 않도록 조회
+                task.exception()
+    
+    return _token_response(token_data)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(request: RefreshTokenRequest):
+    """
+    토큰 갱신
+    
+    refresh_token grant로 새 액세스 토큰을 발급합니다 (비밀번호 검증 없음).
+    
+    Args:
+        request: 로그인 시 받은 refresh_token
+    
+    Returns:
+        새 JWT 액세스 토큰 및 refresh_token
+    """
+    try:
+        token_data = await auth_service.refresh_grant(request.refresh_token)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Login failed: {str(e)}"
+            detail=f"Token refresh failed: {str(e)}"
+        )
+    if token_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
         )
+    return _token_response(token_data)
 
 
 @router.post("/logout")
@@ -2,59 +2,47 @@
 ContentLikes API endpoints
 컨텐츠 좋아요
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
-from app.core.security import security, verify_token
-from fastapi.security import HTTPAuthorizationCredentials
+from app.core.database import get_db, get_read_db
+from app.core.pagination import decode_cursor, paginate
+from app.core.security import get_current_user_id
 from app.models.content_like import ContentLike
 from app.models.content import Content
-from app.schemas.content_like import ContentLikeResponse
-from app.services.user_service import UserService
+from app.schemas.content_like import ContentLikeResponse, LikedContentsResponse
+from app.services.like_counter import like_counter
+from app.services.liked_contents import liked_contents_service
 
 router = APIRouter(prefix="/contents/{content_id}/likes", tags=["Content Likes"])
+my_likes_router = APIRouter(prefix="/contents/likes", tags=["Content Likes"])
 
-
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """현재 사용자 정보 추출"""
-    payload = await verify_token(credentials)
-    # Keycloak user_id를 DB user_id로 변환 필요
-    # 현재는 Keycloak user_id를 그대로 사용 (추후 매핑 테이블 필요)
-    return payload
+# 좋아요 여부 일괄 조회 최대 컨텐츠 수
+MAX_LIKED_LOOKUP_IDS = 200
 
 
 @router.post("", response_model=ContentLikeResponse, status_code=status.HTTP_201_CREATED)
 async def like_content(
     content_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
     """컨텐츠 좋아요"""
     # 컨텐츠 존재 확인
-    content = db.query(Content).filter(Content.id == content_id).first()
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
     
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
-    
     # 이미 좋아요한 경우 확인
-    existing_like = db.query(ContentLike).filter(
+    existing_like = await db.scalar(select(ContentLike.id).where(
         ContentLike.user_id == user_id,
         ContentLike.contents_id == content_id
-    ).first()
+    ))
     
     if existing_like:
         raise HTTPException(
@@ -70,13 +58,15 @@ async def like_content(
     
     try:
         db.add(db_like)
-        # 좋아요 수 증가
-        content.like_count += 1
-        db.commit()
-        db.refresh(db_like)
+        await db.flush()
+        # 좋아요 수 증가 (contents 행 대신 분산 카운터 행을 원자적으로 증가)
+        await like_counter.increment(db, content_id, 1)
+        await db.commit()
+        liked_contents_service.invalidate(user_id)
+        await db.refresh(db_like)
         return db_like
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to like content"
@@ -86,22 +76,14 @@ async def like_content(
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def unlike_content(
     content_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
     """컨텐츠 좋아요 취소"""
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
-    
-    like = db.query(ContentLike).filter(
+    like = await db.scalar(select(ContentLike).where(
         ContentLike.user_id == user_id,
         ContentLike.contents_id == content_id
-    ).first()
+    ))
     
     if not like:
         raise HTTPException(
@@ -109,20 +91,63 @@ async def unlike_content(
             detail="Like not found"
         )
     
-    content = db.query(Content).filter(Content.id == content_id).first()
-    if content and content.like_count > 0:
-        content.like_count -= 1
-    
-    db.delete(like)
-    db.commit()
+    await db.delete(like)
+    await db.flush()
+    await like_counter.increment(db, content_id, -1)
+    await db.commit()
+    liked_contents_service.invalidate(user_id)
     return None
 
 
 @router.get("", response_model=List[ContentLikeResponse])
 async def get_content_likes(
     content_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """컨텐츠 좋아요 목록 조회"""
-    likes = db.query(ContentLike).filter(ContentLike.contents_id == content_id).all()
-    return likes
+    """
+    컨텐츠 좋아요 목록 조회 (id 순)
+    
+    (contents_id, id) 인덱스 기준 keyset 페이지네이션.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다. (skip은 하위 호환용)
+    """
+    query = select(ContentLike).where(ContentLike.contents_id == content_id).order_by(ContentLike.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "content_likes", (int,))
+        query = query.where(ContentLike.id > last_id)
+    if skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
+    return paginate(result.scalars().all(), limit, response, "content_likes", lambda like: (like.id,))
+
+
+@my_likes_router.get("/me", response_model=LikedContentsResponse)
+async def get_my_liked_contents(
+    ids: str = Query(..., description=f"쉼표로 구분한 컨텐츠 ID (최대 {MAX_LIKED_LOOKUP_IDS}개)"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    여러 컨텐츠에 대한 내 좋아요 여부 일괄 조회 (카탈로그 그리드용)
+    
+    (user_id, contents_id) 인덱스의 IN 조회 한 번으로 확인하며, 사용자별로 캐시합니다.
+    """
+    try:
+        content_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers"
+        )
+    if len(content_ids) > MAX_LIKED_LOOKUP_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {MAX_LIKED_LOOKUP_IDS})"
+        )
+    
+    return LikedContentsResponse(
+        liked_ids=await liked_contents_service.liked_among(db, user_id, content_ids)
+    )
@@ -2,30 +2,30 @@
 Contents API endpoints
 컨텐츠 CRUD
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import security, verify_token
-from fastapi.security import HTTPAuthorizationCredentials
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from app.core.database import get_db, get_read_db, get_read_sessions
+from app.core.pagination import decode_cursor, paginate
+from app.core.security import get_current_user, get_current_user_id
 from app.models.content import Content
-from app.schemas.content import ContentCreate, ContentUpdate, ContentResponse
+from app.models.watch_history import WatchHistory
+from app.schemas.content import ContentCreate, ContentUpdate, ContentResponse, ContentDetailResponse
+from app.services.like_counter import like_counter
+from app.services.liked_contents import liked_contents_service
+from app.services.watch_progress_buffer import watch_progress_buffer
 from app.services.search import search_service
 
 router = APIRouter(prefix="/contents", tags=["Contents"])
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """현재 사용자 정보 추출"""
-    return await verify_token(credentials)
-
-
 @router.post("", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
 async def create_content(
     content_data: ContentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """컨텐츠 생성"""
@@ -36,8 +36,8 @@ async def create_content(
         like_count=0
     )
     db.add(db_content)
-    db.commit()
-    db.refresh(db_content)
+    await db.commit()
+    await db.refresh(db_content)
     
     # Meilisearch 인덱스에 동기화
     if search_service.is_available():
@@ -55,39 +55,105 @@ async def create_content(
 
 @router.get("", response_model=List[ContentResponse])
 async def list_contents(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """컨텐츠 목록 조회"""
-    contents = db.query(Content).offset(skip).limit(limit).all()
-    return contents
+    """
+    컨텐츠 목록 조회 (id 순)
+    
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다.
+    cursor를 사용하면 페이지 깊이와 관계없이 PK 범위 조회로 처리됩니다. (skip은 하위 호환용)
+    """
+    query = select(Content).order_by(Content.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "contents", (int,))
+        query = query.where(Content.id > last_id)
+    if skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
+    page = paginate(result.scalars().all(), limit, response, "contents", lambda content: (content.id,))
+    # 롤업되지 않은 좋아요 수 증감 합산
+    return await like_counter.apply_pending(db, page)
 
 
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """컨텐츠 상세 조회"""
-    content = db.query(Content).filter(Content.id == content_id).first()
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
+    await like_counter.apply_pending(db, [content])
     return content
 
 
+@router.get("/{content_id}/detail", response_model=ContentDetailResponse)
+async def get_content_detail(
+    content_id: int,
+    sessions: async_sessionmaker = Depends(get_read_sessions),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    컨텐츠 상세 화면 조회 (컨텐츠, 영상 파일, 내 시청 위치, 좋아요 여부를 한 번에)
+    
+    영상 파일은 selectinload로 함께 읽고, 서로 독립적인 조회는 각자의 세션으로 동시에 실행합니다.
+    시청 위치는 write-behind 버퍼, 좋아요 여부는 사용자별 캐시에 있으면 DB를 조회하지 않습니다.
+    """
+    async def load_content() -> Optional[Content]:
+        async with sessions() as db:
+            row = (await db.execute(
+                select(Content, like_counter.pending_column())
+                .options(selectinload(Content.video_assets))
+                .where(Content.id == content_id)
+            )).first()
+            return like_counter.add_pending(*row) if row else None
+    
+    async def load_progress() -> Optional[WatchHistory]:
+        buffered = watch_progress_buffer.get(user_id, content_id)
+        if buffered:
+            return buffered
+        async with sessions() as db:
+            return await db.scalar(select(WatchHistory).where(
+                WatchHistory.user_id == user_id,
+                WatchHistory.content_id == content_id
+            ))
+    
+    async def load_liked() -> bool:
+        async with sessions() as db:
+            return bool(await liked_contents_service.liked_among(db, user_id, [content_id]))
+    
+    content, progress, liked = await asyncio.gather(load_content(), load_progress(), load_liked())
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    
+    return {
+        **ContentResponse.model_validate(content).model_dump(),
+        "video_assets": content.video_assets,
+        "progress": progress,
+        "liked": liked,
+    }
+
+
 @router.put("/{content_id}", response_model=ContentResponse)
 async def update_content(
     content_id: int,
     content_data: ContentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """컨텐츠 수정"""
-    content = db.query(Content).filter(Content.id == content_id).first()
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -101,8 +167,10 @@ async def update_content(
     if content_data.age_rating is not None:
         content.age_rating = content_data.age_rating
     
-    db.commit()
-    db.refresh(content)
+    await db.commit()
+    await db.refresh(content)
+    # 롤업되지 않은 좋아요 수 증감 반영 (응답과 검색 인덱스 문서 모두 조회 API와 같은 값)
+    await like_counter.apply_pending(db, [content])
     
     # Meilisearch 인덱스에 동기화
     if search_service.is_available():
@@ -121,19 +189,19 @@ async def update_content(
 @router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_content(
     content_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """컨텐츠 삭제"""
-    content = db.query(Content).filter(Content.id == content_id).first()
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
     
-    db.delete(content)
-    db.commit()
+    await db.delete(content)
+    await db.commit()
     
     # Meilisearch 인덱스에서 삭제
     if search_service.is_available():
@@ -1,7 +1,8 @@
 """
 Health check endpoints
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
+from app.core.schema import schema_guard
 
 
 router = APIRouter(prefix="/health", tags=["Health"])
@@ -15,5 +16,10 @@ async def health_check():
 
 @router.get("/ready")
 async def readiness_check():
-    """레디니스 체크 엔드포인트"""
+    """레디니스 체크 엔드포인트 (스키마가 맞지 않아 읽기 전용인 동안은 503)"""
+    if not await schema_guard.ensure_writable():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database schema is not up to date"
+        )
     return {"status": "ready"}
@@ -0,0 +1,99 @@
+"""
+Metrics endpoint
+Prometheus 스크랩용 메트릭 (DB 커넥션 풀, SQL 실행 시간, 캐시, 비밀번호 해싱 큐, 시청 위치 버퍼)
+"""
+import secrets
+from typing import Callable, Iterator, Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.core.config import settings
+from app.core.metrics import CallbackMetric, Sample, metrics_registry
+from app.core.security import token_cache
+from app.services.password_hasher import password_hasher
+from app.services.liked_contents import liked_contents_cache
+from app.services.user_service import user_id_cache
+from app.services.watch_progress_buffer import watch_progress_buffer
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+# 캐시 이름 -> stats()를 제공하는 캐시
+_caches = {
+    "token_cache": token_cache,
+    "user_id_cache": user_id_cache,
+    "liked_contents_cache": liked_contents_cache,
+}
+
+
+def _cache_stat(field: str) -> Callable[[], Iterator[Sample]]:
+    def collect() -> Iterator[Sample]:
+        for name, cache in _caches.items():
+            yield {"cache": name}, cache.stats()[field]
+    return collect
+
+
+def _hasher_stat(field: str) -> Callable[[], Iterator[Sample]]:
+    def collect() -> Iterator[Sample]:
+        yield {}, password_hasher.stats()[field]
+    return collect
+
+
+def _watch_progress_stat(field: str) -> Callable[[], Iterator[Sample]]:
+    def collect() -> Iterator[Sample]:
+        yield {}, watch_progress_buffer.stats()[field]
+    return collect
+
+
+# (메트릭 이름, 설명, 타입, stats 필드)
+_CACHE_METRICS = [
+    ("cache_entries", "Entries currently cached", "gauge", "size"),
+    ("cache_max_entries", "Cache capacity", "gauge", "maxsize"),
+    ("cache_hits_total", "Cache hits", "counter", "hits"),
+    ("cache_misses_total", "Cache misses", "counter", "misses"),
+    ("cache_evictions_total", "Entries evicted to stay within capacity", "counter", "evictions"),
+]
+_HASHER_METRICS = [
+    ("password_hash_workers", "bcrypt worker processes", "gauge", "workers"),
+    ("password_hash_pending", "Hash jobs running or queued", "gauge", "pending"),
+    ("password_hash_queued", "Hash jobs waiting for a worker", "gauge", "queued"),
+    ("password_hash_max_pending", "Admission limit for running + queued hash jobs", "gauge", "max_pending"),
+    ("password_hash_bulk_running", "Bulk import hash jobs running (outside the admission limit)", "gauge", "bulk_running"),
+    ("password_hash_completed_total", "Hash jobs completed", "counter", "completed"),
+    ("password_hash_rejected_total", "Hash jobs rejected with 503 by admission control", "counter", "rejected"),
+]
+_WATCH_PROGRESS_METRICS = [
+    ("watch_progress_buffer_entries", "Watch history rows held in the write-behind buffer", "gauge", "entries"),
+    ("watch_progress_buffer_pending", "Buffered progress updates not yet written", "gauge", "pending"),
+    ("watch_progress_heartbeats_total", "Buffered progress heartbeats received", "counter", "received"),
+    ("watch_progress_heartbeats_dropped_total", "Heartbeats dropped as below the minimum delta", "counter", "dropped"),
+    ("watch_progress_flushed_rows_total", "Rows written by buffer flushes", "counter", "flushed_rows"),
+    ("watch_progress_flushes_total", "Buffer flushes that wrote rows", "counter", "flushes"),
+    ("watch_progress_flush_errors_total", "Buffer flushes that failed and were retried", "counter", "flush_errors"),
+]
+
+for _name, _documentation, _type, _field in _CACHE_METRICS:
+    metrics_registry.register(CallbackMetric(_name, _documentation, _type, _cache_stat(_field), labelnames=["cache"]))
+for _name, _documentation, _type, _field in _HASHER_METRICS:
+    metrics_registry.register(CallbackMetric(_name, _documentation, _type, _hasher_stat(_field)))
+for _name, _documentation, _type, _field in _WATCH_PROGRESS_METRICS:
+    metrics_registry.register(CallbackMetric(_name, _documentation, _type, _watch_progress_stat(_field)))
+
+
+@router.get("", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus 텍스트 형식 메트릭 (워커 프로세스별 값)
+    
+    METRICS_ENABLED가 꺼져 있으면 404, METRICS_TOKEN이 설정되어 있으면 `Authorization: Bearer <token>` 필요
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        (authorization or "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return Response(generate_latest(metrics_registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
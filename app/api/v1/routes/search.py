@@ -4,8 +4,10 @@ Search API endpoints
 """
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
+from app.services.like_counter import like_counter
 from app.services.search import search_service
 from app.schemas.search import SearchResponse
 from app.schemas.content import ContentResponse
@@ -19,7 +21,7 @@ async def search_contents(
     q: str = Query(..., min_length=1, description="검색어"),
     limit: int = Query(20, ge=1, le=100, description="결과 개수 제한"),
     offset: int = Query(0, ge=0, description="결과 오프셋"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     콘텐츠 검색
@@ -44,8 +46,14 @@ async def search_contents(
         contents_dict = {}
         if hit_ids:
             try:
-                contents = db.query(Content).filter(Content.id.in_(hit_ids)).all()
-                contents_dict = {content.id: content for content in contents}
+                # 롤업되지 않은 좋아요 수 증감을 같은 쿼리에서 합산 (컨텐츠 조회 API와 같은 값)
+                result = await db.execute(
+                    select(Content, like_counter.pending_column()).where(Content.id.in_(hit_ids))
+                )
+                contents_dict = {
+                    content.id: like_counter.add_pending(content, pending)
+                    for content, pending in result.all()
+                }
             except Exception:
                 # DB 연결 실패 시 Meilisearch 결과만 반환
                 pass
@@ -2,27 +2,29 @@
 User API endpoints
 사용자 관련 API (JWT 검증 필요)
 """
+import json
+import tempfile
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPAuthorizationCredentials
-from app.core.security import security, verify_token
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.pagination import decode_cursor, paginate, stored_datetime, stored_key, stored_value
+from app.core.security import get_current_user, get_current_user_id
+from app.models.content import Content
+from app.models.content_like import ContentLike
+from app.schemas.content import ContentResponse
+from app.schemas.content_like import MyLikeResponse
 from app.services.auth import auth_service
+from app.services.like_counter import like_counter
+from app.services.user_import import user_import_service, detect_format, FORMAT_CSV, FORMAT_NDJSON
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> Dict[str, Any]:
-    """
-    현재 사용자 정보 추출 (의존성 주입)
-    JWT 토큰에서 사용자 정보를 추출합니다.
-    """
-    payload = await verify_token(credentials)
-    return payload
-
-
 @router.get("")
 async def list_users(
     current_user: Dict[str, Any] = Depends(get_current_user),
@@ -73,6 +75,66 @@ async def list_users(
         )
 
 
+@router.post("/bulk-import")
+async def bulk_import_users(
+    request: Request,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="업로드 형식 (기본값: Content-Type으로 판단)")
+):
+    """
+    대량 회원 등록 (관리자만)
+    
+    요청 본문으로 CSV(헤더 포함) 또는 NDJSON(한 줄에 한 사용자)을 받습니다.
+    필드: email, password, region_code, subscription_status, first_name, last_name
+    
+    Args:
+        format: 업로드 형식 ("csv" 또는 "ndjson")
+    
+    Returns:
+        행별 결과를 NDJSON으로 스트리밍 (마지막 줄은 요약)
+    """
+    # 관리자 권한 확인
+    roles = current_user.get("realm_access", {}).get("roles", [])
+    if "admin" not in roles and "realm-admin" not in roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in (FORMAT_CSV, FORMAT_NDJSON):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload must be text/csv or application/x-ndjson"
+        )
+    
+    # 응답 스트리밍 중에는 요청 본문을 읽을 수 없으므로 먼저 임시 파일에 스풀링
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.BULK_IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload exceeds {settings.BULK_IMPORT_MAX_BYTES} bytes"
+                )
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    
+    async def results():
+        try:
+            async for result in user_import_service.import_users(spool, fmt):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            spool.close()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @router.get("/me")
 async def get_my_info(
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -97,6 +159,69 @@ async def get_my_info(
     }
 
 
+@router.get("/me/likes", response_model=List[MyLikeResponse])
+async def get_my_likes(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    include_content: bool = Query(False, description="컨텐츠 정보 포함 여부"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    내가 좋아요한 컨텐츠 목록 (최근 좋아요 순)
+    
+    (user_id, created_at, contents_id) covering 인덱스 기준 keyset 페이지네이션.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다.
+    include_content=true이면 페이지의 컨텐츠를 쿼리 한 번으로 함께 조회합니다.
+    """
+    # 커서에는 저장된 created_at 값을 그대로 담아 비교 (SQLite 텍스트 형식 차이로 같은 행이 반복되지 않도록)
+    created_key = stored_key(ContentLike.created_at)
+    query = select(
+        ContentLike.id, ContentLike.user_id, ContentLike.contents_id, ContentLike.created_at,
+        created_key.label("created_key")
+    ).where(
+        ContentLike.user_id == user_id
+    ).order_by(ContentLike.created_at.desc(), ContentLike.contents_id.desc())
+    if cursor:
+        last_created_at, last_content_id = decode_cursor(cursor, "my_likes", (stored_datetime, int))
+        query = query.where(
+            created_key <= last_created_at,
+            or_(
+                created_key < last_created_at,
+                and_(created_key == last_created_at, ContentLike.contents_id < last_content_id)
+            )
+        )
+    result = await db.execute(query.limit(limit + 1))
+    likes = paginate(
+        result.all(), limit, response, "my_likes",
+        lambda like: (stored_value(like.created_key), like.contents_id)
+    )
+    
+    contents: Dict[int, ContentResponse] = {}
+    if include_content and likes:
+        content_rows = await db.execute(
+            select(Content, like_counter.pending_column()).where(
+                Content.id.in_([like.contents_id for like in likes])
+            )
+        )
+        contents = {
+            content.id: ContentResponse.model_validate(like_counter.add_pending(content, pending))
+            for content, pending in content_rows.all()
+        }
+    
+    return [
+        MyLikeResponse(
+            id=like.id,
+            user_id=like.user_id,
+            contents_id=like.contents_id,
+            created_at=like.created_at,
+            content=contents.get(like.contents_id)
+        )
+        for like in likes
+    ]
+
+
 @router.get("/{user_id}")
 async def get_user_info(
     user_id: str,
@@ -107,7 +232,7 @@ async def get_user_info(
     
     Args:
         user_id: 조회할 사용자 ID (Keycloak 사용자 ID 또는 "me")
-        
+    
     Returns:
         사용자 정보
     """
@@ -4,10 +4,10 @@ VideoAssets API endpoints
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import security, verify_token
-from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.core.security import get_current_user
 from app.models.video_asset import VideoAsset
 from app.models.content import Content
 from app.schemas.video_asset import VideoAssetCreate, VideoAssetUpdate, VideoAssetResponse
@@ -16,23 +16,16 @@ from app.services.s3_service import s3_service
 router = APIRouter(prefix="/contents/{content_id}/video-assets", tags=["Video Assets"])
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """현재 사용자 정보 추출"""
-    return await verify_token(credentials)
-
-
 @router.post("", response_model=VideoAssetResponse, status_code=status.HTTP_201_CREATED)
 async def create_video_asset(
     content_id: int,
     asset_data: VideoAssetCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """영상 파일 정보 생성"""
     # 컨텐츠 존재 확인
-    content = db.query(Content).filter(Content.id == content_id).first()
+    content = await db.get(Content, content_id)
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,32 +46,32 @@ async def create_video_asset(
         resolution=asset_data.resolution
     )
     db.add(db_asset)
-    db.commit()
-    db.refresh(db_asset)
+    await db.commit()
+    await db.refresh(db_asset)
     return db_asset
 
 
 @router.get("", response_model=List[VideoAssetResponse])
 async def list_video_assets(
     content_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """컨텐츠의 영상 파일 정보 목록 조회"""
-    assets = db.query(VideoAsset).filter(VideoAsset.content_id == content_id).all()
-    return assets
+    result = await db.execute(select(VideoAsset).where(VideoAsset.content_id == content_id))
+    return result.scalars().all()
 
 
 @router.get("/{asset_id}", response_model=VideoAssetResponse)
 async def get_video_asset(
     content_id: int,
     asset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """영상 파일 정보 상세 조회"""
-    asset = db.query(VideoAsset).filter(
+    asset = await db.scalar(select(VideoAsset).where(
         VideoAsset.id == asset_id,
         VideoAsset.content_id == content_id
-    ).first()
+    ))
     
     if not asset:
         raise HTTPException(
@@ -94,14 +87,14 @@ async def update_video_asset(
     content_id: int,
     asset_id: int,
     asset_data: VideoAssetUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """영상 파일 정보 수정"""
-    asset = db.query(VideoAsset).filter(
+    asset = await db.scalar(select(VideoAsset).where(
         VideoAsset.id == asset_id,
         VideoAsset.content_id == content_id
-    ).first()
+    ))
     
     if not asset:
         raise HTTPException(
@@ -116,8 +109,8 @@ async def update_video_asset(
     if asset_data.resolution is not None:
         asset.resolution = asset_data.resolution
     
-    db.commit()
-    db.refresh(asset)
+    await db.commit()
+    await db.refresh(asset)
     return asset
 
 
@@ -125,14 +118,14 @@ async def update_video_asset(
 async def delete_video_asset(
     content_id: int,
     asset_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """영상 파일 정보 삭제"""
-    asset = db.query(VideoAsset).filter(
+    asset = await db.scalar(select(VideoAsset).where(
         VideoAsset.id == asset_id,
         VideoAsset.content_id == content_id
-    ).first()
+    ))
     
     if not asset:
         raise HTTPException(
@@ -140,8 +133,8 @@ async def delete_video_asset(
             detail="Video asset not found"
         )
     
-    db.delete(asset)
-    db.commit()
+    await db.delete(asset)
+    await db.commit()
     return None
 
 
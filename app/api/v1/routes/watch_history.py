@@ -3,117 +3,95 @@ WatchHistory API endpoints
 시청기록
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import security, verify_token
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.core.pagination import decode_cursor, paginate, stored_datetime, stored_key, stored_value
+from app.core.security import get_current_user_id
 from app.models.watch_history import WatchHistory
-from app.models.content import Content
 from app.schemas.watch_history import WatchHistoryCreate, WatchHistoryUpdate, WatchHistoryResponse
-from app.services.user_service import UserService
+from app.services.watch_progress_buffer import watch_progress_buffer
 
 router = APIRouter(prefix="/watch-history", tags=["Watch History"])
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """현재 사용자 정보 추출"""
-    payload = await verify_token(credentials)
-    return payload
-
-
 @router.post("", response_model=WatchHistoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_watch_history(
     history_data: WatchHistoryCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
-    """시청기록 생성 또는 업데이트"""
-    # 컨텐츠 존재 확인
-    content = db.query(Content).filter(Content.id == history_data.content_id).first()
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Content not found"
-        )
+    """
+    시청기록 생성 또는 업데이트
     
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
-    
-    # 기존 시청기록 확인
-    existing_history = db.query(WatchHistory).filter(
-        WatchHistory.user_id == user_id,
-        WatchHistory.content_id == history_data.content_id
-    ).first()
-    
-    if existing_history:
-        # 업데이트
-        existing_history.last_played_time = history_data.last_played_time
-        db.commit()
-        db.refresh(existing_history)
-        return existing_history
-    else:
-        # 생성
-        db_history = WatchHistory(
-            user_id=user_id,
-            content_id=history_data.content_id,
-            last_played_time=history_data.last_played_time
-        )
-        db.add(db_history)
-        db.commit()
-        db.refresh(db_history)
-        return db_history
+    (user_id, content_id) 기준 upsert 한 문장으로 저장하며, 컨텐츠가 없으면 FK 제약 위반으로 404를 반환합니다.
+    이미 저장한 시청기록의 이후 heartbeat는 write-behind 버퍼에 모았다가 주기적으로 기록합니다.
+    """
+    return await watch_progress_buffer.save(
+        db, user_id, history_data.content_id, history_data.last_played_time
+    )
 
 
 @router.get("", response_model=List[WatchHistoryResponse])
 async def get_watch_history(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id)
 ):
-    """사용자의 시청기록 목록 조회"""
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
+    """
+    사용자의 시청기록 목록 조회 (최근 시청 순)
     
-    histories = db.query(WatchHistory).filter(
+    (updated_at, id) 기준 keyset 페이지네이션으로 ix_watch_history_user_updated 인덱스 범위만 읽습니다.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다. (skip은 하위 호환용)
+    """
+    # 커서에는 저장된 updated_at 값을 그대로 담아 비교 (SQLite 텍스트 형식 차이로 같은 행이 반복되지 않도록)
+    updated_key = stored_key(WatchHistory.updated_at)
+    query = select(WatchHistory, updated_key.label("updated_key")).where(
         WatchHistory.user_id == user_id
-    ).order_by(WatchHistory.updated_at.desc()).offset(skip).limit(limit).all()
+    ).order_by(WatchHistory.updated_at.desc(), WatchHistory.id.desc())
+    if cursor:
+        last_updated_at, last_id = decode_cursor(cursor, "watch_history", (stored_datetime, int))
+        # updated_at <= ? 조건을 함께 두어 옵티마이저가 인덱스 범위 조회를 사용하도록 함
+        query = query.where(
+            updated_key <= last_updated_at,
+            or_(
+                updated_key < last_updated_at,
+                and_(updated_key == last_updated_at, WatchHistory.id < last_id)
+            )
+        )
+    if skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
     
-    return histories
+    page = paginate(
+        result.all(),
+        limit,
+        response,
+        "watch_history",
+        lambda row: (stored_value(row[1]), row[0].id)
+    )
+    return [history for history, _ in page]
 
 
 @router.get("/{content_id}", response_model=WatchHistoryResponse)
 async def get_watch_history_by_content(
     content_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id)
 ):
-    """특정 컨텐츠의 시청기록 조회"""
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
+    """특정 컨텐츠의 시청기록 조회 (아직 기록되지 않은 버퍼 값 우선)"""
+    buffered = watch_progress_buffer.get(user_id, content_id)
+    if buffered:
+        return buffered
     
-    history = db.query(WatchHistory).filter(
+    history = await db.scalar(select(WatchHistory).where(
         WatchHistory.user_id == user_id,
         WatchHistory.content_id == content_id
-    ).first()
+    ))
     
     if not history:
         raise HTTPException(
@@ -128,22 +106,13 @@ async def get_watch_history_by_content(
 async def update_watch_history(
     content_id: int,
     history_data: WatchHistoryUpdate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
-    """시청기록 수정"""
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
-    
-    history = db.query(WatchHistory).filter(
-        WatchHistory.user_id == user_id,
-        WatchHistory.content_id == content_id
-    ).first()
+    """시청기록 수정 (UPDATE 한 번 또는 write-behind 버퍼, 기록이 없으면 404)"""
+    history = await watch_progress_buffer.update(
+        db, user_id, content_id, history_data.last_played_time
+    )
     
     if not history:
         raise HTTPException(
@@ -151,31 +120,23 @@ async def update_watch_history(
             detail="Watch history not found"
         )
     
-    history.last_played_time = history_data.last_played_time
-    db.commit()
-    db.refresh(history)
     return history
 
 
 @router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_watch_history(
     content_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
 ):
     """시청기록 삭제"""
-    # JWT에서 email을 사용하여 DB user_id 가져오기
-    user_id = UserService.get_user_id_from_jwt(db, current_user)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found in database. Please register first."
-        )
+    # 삭제 후 버퍼 기록으로 행이 되살아나지 않도록 먼저 제거
+    await watch_progress_buffer.discard(user_id, content_id)
     
-    history = db.query(WatchHistory).filter(
+    history = await db.scalar(select(WatchHistory).where(
         WatchHistory.user_id == user_id,
         WatchHistory.content_id == content_id
-    ).first()
+    ))
     
     if not history:
         raise HTTPException(
@@ -183,6 +144,6 @@ async def delete_watch_history(
             detail="Watch history not found"
         )
     
-    db.delete(history)
-    db.commit()
+    await db.delete(history)
+    await db.commit()
     return None
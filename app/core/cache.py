@@ -0,0 +1,100 @@
+"""
+In-process cache utilities
+크기 제한 LRU + 항목별 만료 시간 캐시
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    크기 제한 LRU 캐시 (항목별 만료 시간 지원)
+    
+    - 가장 오래 사용되지 않은 항목부터 제거 (maxsize 초과 시)
+    - 항목마다 만료 시각(epoch 초)을 지정할 수 있으며, 지정하지 않으면 기본 TTL 적용
+    - hit/miss/eviction 카운터 제공
+    """
+    
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        캐시 조회 (만료된 항목은 제거 후 miss 처리)
+        
+        Args:
+            key: 캐시 키
+            default: 없거나 만료된 경우 반환할 값
+        
+        Returns:
+            캐시된 값 또는 default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+    
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: Optional[float] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> None:
+        """
+        캐시 저장
+        
+        Args:
+            key: 캐시 키
+            value: 저장할 값
+            expires_at: 만료 시각 (epoch 초). 지정하지 않으면 TTL 사용
+            ttl_seconds: 이 항목에만 적용할 TTL (없으면 기본 TTL)
+        """
+        if expires_at is None:
+            ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+            if ttl is not None:
+                expires_at = time.time() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        """항목 무효화"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """전체 무효화"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, int]:
+        """캐시 통계 (크기, hit/miss, eviction)"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -27,10 +27,72 @@ class Settings(BaseSettings):
     # Keycloak Admin API (관리자 API 접근용)
     KEYCLOAK_ADMIN_USERNAME: Optional[str] = None
     KEYCLOAK_ADMIN_PASSWORD: Optional[str] = None
+    KEYCLOAK_ADMIN_TOKEN_REFRESH_MARGIN_SECONDS: float = 30.0  # 만료 몇 초 전에 미리 갱신할지
+    KEYCLOAK_ADMIN_TOKEN_RETRY_SECONDS: float = 5.0  # 갱신 실패 시 재시도 간격
+    
+    # 외부 HTTP 호출 (Keycloak) 커넥션 풀
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP2_ENABLED: bool = False  # h2 패키지 필요 (httpx[http2])
     
     # JWT
     JWT_ALGORITHM: str = "RS256"
     JWT_PUBLIC_KEY: Optional[str] = None
+    JWT_VERIFIER_BACKEND: str = "cryptography"  # "cryptography" 또는 "jose"
+    JWKS_CACHE_TTL_SECONDS: int = 300  # JWKS 백그라운드 갱신 주기
+    JWKS_MIN_REFETCH_INTERVAL_SECONDS: float = 10.0  # 모르는 kid로 인한 재조회 최소 간격
+    JWKS_STALE_GRACE_SECONDS: float = 600.0  # TTL 만료 후에도 기존 키로 검증을 허용하는 유예 시간
+    TOKEN_CACHE_ENABLED: bool = True  # 검증된 토큰 캐시 사용 여부
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # 검증된 토큰 캐시 최대 항목 수
+    TOKEN_CACHE_BACKEND: str = "memory"  # "memory" (프로세스별) 또는 "shm" (워커 간 공유)
+    SHARED_CACHE_PATH: str = "/dev/shm/backend-auth-cache"  # 공유 캐시 파일 경로
+    SHARED_CACHE_SLOTS: int = 4096  # 공유 캐시 슬롯 수
+    SHARED_CACHE_SLOT_SIZE: int = 4096  # 슬롯 크기 (바이트, 헤더 포함)
+    
+    # 비밀번호 해싱 (bcrypt 전용 프로세스 풀)
+    PASSWORD_HASH_WORKERS: int = 0  # 0이면 CPU 코어 수
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 실행+대기 작업 상한 (초과 시 503)
+    PASSWORD_HASH_BULK_CONCURRENCY: int = 0  # 대량 등록 동시 해싱 수 (0이면 작업자 수의 절반, 초과 시 대기)
+    
+    # 사용자 매핑 캐시 (JWT email -> DB user_id)
+    USER_ID_CACHE_MAX_SIZE: int = 10000
+    USER_ID_CACHE_TTL_SECONDS: float = 300.0
+    USER_ID_NEGATIVE_CACHE_TTL_SECONDS: float = 10.0  # 미등록 사용자 음성 캐시 유지 시간
+    
+    # 사용자별 좋아요 여부 캐시 (GET /contents/likes/me)
+    LIKED_CONTENTS_CACHE_MAX_SIZE: int = 10000  # 캐시하는 사용자 수
+    LIKED_CONTENTS_CACHE_TTL_SECONDS: float = 60.0  # 다른 워커의 좋아요/취소가 반영되기까지의 최대 시간
+    
+    # Keycloak 사용자 생성 outbox 워커
+    OUTBOX_ENCRYPTION_KEY: Optional[str] = None  # Fernet 키 (Keycloak Admin API 설정 시 필수, 쉼표로 구분해 이전 키 유지 가능)
+    PROVISIONING_BATCH_SIZE: int = 50  # 한 번에 가져올 outbox 항목 수
+    PROVISIONING_CONCURRENCY: int = 5  # 동시 Keycloak 요청 수
+    PROVISIONING_POLL_INTERVAL_SECONDS: float = 5.0  # 대기 항목 조회 주기
+    PROVISIONING_LEASE_SECONDS: float = 60.0  # 처리 중 항목을 다른 워커가 가져가지 않는 시간
+    PROVISIONING_MAX_ATTEMPTS: int = 8  # 최대 재시도 횟수 (초과 시 failed)
+    PROVISIONING_BACKOFF_BASE_SECONDS: float = 2.0  # 재시도 간격 (지수 증가)
+    PROVISIONING_BACKOFF_MAX_SECONDS: float = 300.0  # 재시도 간격 상한
+    
+    # 대량 회원 등록 (/users/bulk-import)
+    BULK_IMPORT_BATCH_SIZE: int = 500  # 배치당 행 수 (multi-row insert 단위)
+    BULK_IMPORT_MAX_BYTES: int = 100 * 1024 * 1024  # 업로드 최대 크기
+    
+    # 시청 위치 write-behind 버퍼 (POST/PUT /watch-history heartbeat)
+    WATCH_PROGRESS_BUFFER_ENABLED: bool = True  # false면 요청마다 즉시 DB에 기록
+    WATCH_PROGRESS_FLUSH_INTERVAL_SECONDS: float = 15.0  # 버퍼를 DB에 기록하는 주기
+    WATCH_PROGRESS_MAX_PENDING: int = 1000  # 대기 항목이 이 수에 도달하면 주기 전에 기록
+    WATCH_PROGRESS_MIN_DELTA_SECONDS: float = 2.0  # 직전 값과의 차이가 이보다 작은 heartbeat는 버림
+    
+    # 좋아요 수 분산 카운터 (content_like_counters)
+    LIKE_COUNTER_SHARDS: int = 16  # 컨텐츠별 카운터 행 수 (인기 컨텐츠 좋아요 동시 처리량)
+    LIKE_COUNTER_ROLLUP_INTERVAL_SECONDS: float = 30.0  # 카운터 값을 contents.like_count로 옮기는 주기 (0이면 끔)
+    LIKE_COUNTER_ROLLUP_BATCH_SIZE: int = 500  # 롤업 한 번에 처리하는 카운터 행 수
+    
+    # 메트릭 (/api/v1/metrics, Prometheus 텍스트 형식)
+    METRICS_ENABLED: bool = False  # 공개 API에 내부 상태가 노출되지 않도록 기본 비활성화
+    METRICS_TOKEN: Optional[str] = None  # 설정 시 스크랩 요청에 Authorization: Bearer <token> 필요
     
     # Meilisearch (검색 서버)
     MEILISEARCH_URL: Optional[str] = None
@@ -43,6 +105,14 @@ class Settings(BaseSettings):
     DB_USER: Optional[str] = None
     DB_PASSWORD: Optional[str] = None
     DB_NAME: Optional[str] = None
+    DB_POOL_SIZE: int = 5  # 커넥션 풀 기본 연결 수 (워커별)
+    DB_MAX_OVERFLOW: int = 10  # pool_size를 넘어 추가로 열 수 있는 연결 수
+    DB_REPLICA_URLS: Optional[str] = None  # 읽기 전용 replica URL (쉼표로 구분)
+    DB_REPLICA_EJECT_SECONDS: float = 30.0  # 연결 오류가 난 replica를 제외하는 시간
+    DB_STICKY_PRIMARY_SECONDS: float = 5.0  # 쓰기 후 해당 사용자의 읽기를 primary로 보내는 시간 (복제 지연 여유)
+    DB_STICKY_BACKEND: str = "memory"  # "memory" (프로세스별) 또는 "shm" (워커 간 공유)
+    SCHEMA_CHECK_MODE: str = "fail"  # 기동 시 Alembic 리비전 불일치 처리: "fail", "readonly", "skip"
+    SCHEMA_RECHECK_SECONDS: float = 30.0  # readonly 모드에서 스키마를 다시 확인하는 간격
     
     # S3 & CloudFront
     S3_BUCKET_NAME: Optional[str] = None
@@ -1,10 +1,23 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine, text
+import ssl
+import logging
+import time
+from typing import List, Optional
+from fastapi import Request
+from jose import jwt
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import instrument_engine, timed_pool_class
+
+logger = logging.getLogger(__name__)
 
 # Database URL 구성
 if settings.DATABASE_URL:
@@ -18,57 +31,290 @@ else:
     db_path = os.getenv("DB_PATH", "/tmp/test.db")
     database_url = f"sqlite:///{db_path}"
 
-# SQLAlchemy 엔진 생성
-if database_url.startswith("sqlite"):
-    # SQLite는 pool_pre_ping과 pool_recycle을 지원하지 않음
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False},  # SQLite는 단일 스레드만 허용
-        echo=settings.DEBUG
-    )
-else:
+
+def to_async_url(url: str) -> str:
+    """동기 드라이버 URL을 async 드라이버 URL로 변환 (pymysql -> aiomysql, sqlite -> aiosqlite)"""
+    if url.startswith("mysql+pymysql://"):
+        return "mysql+aiomysql://" + url[len("mysql+pymysql://"):]
+    if url.startswith("mysql://"):
+        return "mysql+aiomysql://" + url[len("mysql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def to_sync_url(url: str) -> str:
+    """async 드라이버 URL을 동기 드라이버 URL로 변환 (Alembic 등 동기 도구용)"""
+    return url.replace("+aiomysql", "+pymysql").replace("+asyncmy", "+pymysql").replace("+aiosqlite", "")
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    """
+    async 엔진 생성 (primary / replica 공통 설정)
+    
+    Args:
+        url: async 드라이버 URL
+        name: 메트릭 engine 라벨 (primary, replica-0, ...)
+    """
+    if url.startswith("sqlite"):
+        # SQLite는 pool_pre_ping과 pool_recycle을 지원하지 않음 (aiosqlite 기본 풀은 NullPool)
+        async_engine = create_async_engine(
+            url,
+            poolclass=timed_pool_class(NullPool, name),
+            echo=settings.DEBUG
+        )
+        
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def _enable_foreign_keys(dbapi_connection, connection_record):
+            """SQLite는 연결마다 FK 제약을 켜야 함 (시청기록 upsert가 FK 위반으로 컨텐츠 존재를 확인)"""
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+        
+        instrument_engine(async_engine, name)
+        return async_engine
+    
     # RDS Proxy는 TLS 연결이 필수이므로 SSL 파라미터 추가
     connect_args = {
         "connect_timeout": 3,  # 연결 타임아웃 3초로 단축
     }
-    # RDS Proxy는 항상 TLS 연결이 필요하므로 SSL 파라미터 추가
-    # pymysql에서 SSL을 활성화하려면 ssl 딕셔너리를 전달해야 함
-    # check_hostname=False로 설정하면 호스트명 검증을 건너뜀
-    connect_args["ssl"] = {
-        "check_hostname": False
-    }
+    # RDS Proxy는 항상 TLS 연결이 필요하므로 SSL 컨텍스트 추가
+    # aiomysql은 ssl 딕셔너리 대신 SSLContext를 받음
+    # CA 없이 호스트명/인증서 검증을 건너뜀 (기존 pymysql check_hostname=False 설정과 동일)
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    connect_args["ssl"] = ssl_context
     
-    engine = create_engine(
-        database_url,
+    async_engine = create_async_engine(
+        url,
         pool_pre_ping=True,  # 연결 유효성 검사
         pool_recycle=3600,   # 1시간마다 연결 재사용
         connect_args=connect_args,
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool, name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
         pool_timeout=3,  # 풀 타임아웃 3초로 단축
         pool_reset_on_return='commit',  # 연결 반환 시 리셋
         echo=settings.DEBUG  # 디버그 모드에서 SQL 쿼리 출력
     )
+    
+    @event.listens_for(async_engine.sync_engine, "invalidate")
+    def _log_invalidated_connection(dbapi_connection, connection_record, exception):
+        """pool_pre_ping 실패 등으로 폐기된 연결 기록 (요청마다 probe 쿼리를 보내지 않음)"""
+        if exception is not None:
+            logger.warning(f"Database connection invalidated ({async_engine.url.host}): {exception}")
+    
+    instrument_engine(async_engine, name)
+    return async_engine
+
+
+class PrimarySession(Session):
+    """primary(쓰기) 세션: 쓰기를 커밋하면 해당 사용자를 잠시 primary에 고정"""
+
+
+async_database_url = to_async_url(database_url)
+
+# SQLAlchemy async 엔진 생성
+engine = _create_engine(async_database_url, "primary")
 
 # 세션 팩토리 생성
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 커밋 후에도 응답 직렬화 시 속성을 다시 조회(lazy IO)하지 않도록 expire_on_commit=False
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base 클래스 (모델이 상속받을 클래스)
 Base = declarative_base()
 
 
-def get_db():
+class _Replica:
+    """읽기 전용 replica 엔진과 상태"""
+    
+    def __init__(self, url: str, name: str):
+        self.engine = _create_engine(to_async_url(url), name)
+        self.sessions = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        self.ejected_until = 0.0
+
+
+class DatabaseRouter:
     """
-    데이터베이스 세션 의존성
-    FastAPI의 Depends에서 사용
+    읽기/쓰기 분리 라우터
+    
+    - 읽기 전용 세션은 정상 replica에 round-robin으로 분배합니다.
+    - 연결 오류가 난 replica는 일정 시간 제외(ejection)한 뒤 다시 시도합니다.
+    - 사용자가 쓰기를 커밋하면 복제 지연 시간 동안 그 사용자의 읽기를 primary로 보냅니다.
+    - replica가 없거나 모두 제외된 경우 primary를 사용합니다.
     """
-    db = SessionLocal()
-    try:
-        # 연결 테스트 (빠른 실패) - SQLAlchemy 2.0에서는 text() 필요
+    
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica_urls: List[str],
+        eject_seconds: float,
+        sticky_seconds: float,
+        sticky_store=None
+    ):
+        self.primary = primary
+        self.eject_seconds = eject_seconds
+        self.sticky_seconds = sticky_seconds
+        self.replicas = [_Replica(url, f"replica-{index}") for index, url in enumerate(replica_urls)]
+        self._next = 0
+        self._sticky = sticky_store if sticky_store is not None else TTLCache(maxsize=100000, ttl_seconds=sticky_seconds)
+        for replica in self.replicas:
+            self._watch(replica)
+    
+    def _watch(self, replica: _Replica) -> None:
+        @event.listens_for(replica.engine.sync_engine, "handle_error")
+        def _eject_on_connection_error(context):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+                self.eject(replica, context.original_exception)
+    
+    def eject(self, replica: _Replica, reason: Optional[BaseException] = None) -> None:
+        """replica를 eject_seconds 동안 읽기 대상에서 제외"""
+        if replica.ejected_until <= time.monotonic():
+            logger.warning(f"Read replica ejected ({replica.engine.url.host}) for {self.eject_seconds}s: {reason}")
+        replica.ejected_until = time.monotonic() + self.eject_seconds
+    
+    def reader(self, sticky_key: Optional[str] = None) -> async_sessionmaker:
+        """
+        읽기 세션 팩토리 선택
+        
+        Args:
+            sticky_key: 사용자 식별자 (최근 쓰기가 있으면 primary 사용)
+        
+        Returns:
+            replica 또는 primary 세션 팩토리
+        """
+        if not self.replicas or (sticky_key and self.is_sticky(sticky_key)):
+            return self.primary
+        
+        now = time.monotonic()
+        count = len(self.replicas)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            replica = self.replicas[index]
+            if replica.ejected_until <= now:
+                self._next = (index + 1) % count
+                return replica.sessions
+        return self.primary
+    
+    def mark_write(self, sticky_key: str) -> None:
+        """쓰기 커밋 후 복제 지연 시간 동안 primary 고정"""
+        self._sticky.set(sticky_key, 1, ttl_seconds=self.sticky_seconds)
+    
+    def is_sticky(self, sticky_key: str) -> bool:
+        return self._sticky.get(sticky_key) is not None
+    
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def _create_sticky_store():
+    """primary 고정 기록 저장소 (shm이면 같은 노드의 워커 간 공유)"""
+    if settings.DB_STICKY_BACKEND == "shm":
         try:
-            db.execute(text("SELECT 1"))
-        except Exception:
-            # 연결 실패 시에도 세션을 제공 (일부 기능이 동작할 수 있음)
-            # 실제 쿼리 실행 시 오류가 발생할 것이므로 여기서는 예외를 무시
-            pass
+            from app.core.shm_cache import SharedMemoryCache
+            return SharedMemoryCache(
+                path=f"{settings.SHARED_CACHE_PATH}-sticky",
+                slots=settings.SHARED_CACHE_SLOTS,
+                slot_size=64
+            )
+        except Exception as e:
+            logger.warning(f"공유 메모리 sticky 저장소를 열 수 없어 프로세스 메모리를 사용합니다: {e}")
+    return None
+
+
+# 전역 읽기/쓰기 라우터
+db_router = DatabaseRouter(
+    primary=AsyncSessionLocal,
+    replica_urls=[url.strip() for url in (settings.DB_REPLICA_URLS or "").split(",") if url.strip()],
+    eject_seconds=settings.DB_REPLICA_EJECT_SECONDS,
+    sticky_seconds=settings.DB_STICKY_PRIMARY_SECONDS,
+    sticky_store=_create_sticky_store()
+)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _record_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _record_statement_write(orm_execute_state):
+    # flush를 거치지 않는 INSERT/UPDATE/DELETE 문 (예: 시청기록 upsert)
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _stick_to_primary(session):
+    # 응답 전(커밋 시점)에 기록해야 클라이언트의 바로 다음 읽기가 primary로 감
+    if session.info.pop("wrote", False) and session.info.get("sticky_key"):
+        db_router.mark_write(session.info["sticky_key"])
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("wrote", None)
+
+
+def _sticky_key(request: Request) -> Optional[str]:
+    """
+    라우팅용 사용자 식별자 (JWT sub)
+    
+    서명을 검증하지 않은 클레임이지만 읽기 라우팅에만 사용하므로, 위조되어도
+    primary에서 읽게 될 뿐 권한에는 영향이 없습니다.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except Exception:
+        return None
+
+
+async def get_db(request: Request):
+    """
+    데이터베이스 세션 의존성 (AsyncSession, primary)
+    FastAPI의 Depends에서 사용
+    
+    세션은 첫 쿼리를 실행할 때 풀에서 연결을 가져오므로, 쿼리 없이 끝나는 요청
+    (캐시 히트, 검증 실패 등)은 커넥션 풀을 사용하지 않습니다.
+    끊어진 연결은 체크아웃 시 pool_pre_ping이 감지하여 교체합니다.
+    """
+    async with AsyncSessionLocal() as db:
+        db.info["sticky_key"] = _sticky_key(request)
+        yield db
+
+
+def get_read_sessions(request: Request) -> async_sessionmaker:
+    """
+    읽기 세션 팩토리 의존성 (replica 우선, get_read_db와 같은 라우팅)
+    
+    AsyncSession 하나로는 쿼리를 동시에 실행할 수 없으므로, 독립적인 조회를 동시에 실행하는
+    엔드포인트는 조회마다 이 팩토리로 세션을 엽니다. (연결은 첫 쿼리 때 가져옴)
+    """
+    return db_router.reader(_sticky_key(request))
+
+
+async def get_read_db(request: Request):
+    """
+    읽기 전용 세션 의존성 (replica 우선)
+    
+    최근 쓰기를 커밋한 사용자의 요청은 DB_STICKY_PRIMARY_SECONDS 동안 primary로 보냅니다.
+    """
+    sessions = db_router.reader(_sticky_key(request))
+    async with sessions() as db:
         yield db
-    finally:
-        db.close()
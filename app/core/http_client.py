@@ -0,0 +1,61 @@
+"""
+Shared HTTP client
+Keycloak 등 외부 서비스 호출에 사용하는 공용 httpx.AsyncClient
+
+요청마다 클라이언트를 새로 만들면 매번 TCP/TLS 핸드셰이크가 발생하므로,
+keep-alive 커넥션 풀을 가진 클라이언트 하나를 애플리케이션 수명 동안 재사용합니다.
+"""
+import logging
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (h2 패키지 필요)"""
+    if not settings.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("HTTP2_ENABLED=true 이지만 h2 패키지가 없어 HTTP/1.1을 사용합니다. (pip install 'httpx[http2]')")
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS)
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    공용 HTTP 클라이언트 반환
+    애플리케이션 시작 시 생성되며, 시작 이벤트 밖(스크립트 등)에서 호출하면 처음 호출 시 생성됩니다.
+    
+    Returns:
+        커넥션 풀을 공유하는 httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """공용 HTTP 클라이언트 종료 (애플리케이션 종료 시 호출)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,230 @@
+"""
+Application metrics
+Prometheus 카운터/게이지/히스토그램(prometheus_client)과 DB 커넥션 풀 계측
+
+- 값은 프로세스(워커)별로 집계되며, 여러 워커를 사용하는 경우 Prometheus에서 합산합니다.
+- 커넥션 풀 상태(사용 중/overflow 연결 수)처럼 조회 시점에 계산되는 값은 CallbackMetric으로 노출합니다.
+"""
+import logging
+import time
+from typing import Callable, Dict, Iterable, Iterator, Sequence, Tuple, Type
+from prometheus_client import CollectorRegistry, Counter, Histogram, disable_created_metrics
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# 카운터/히스토그램마다 생성 시각(*_created) 시계열을 추가로 노출하지 않음
+disable_created_metrics()
+
+# (라벨, 값)
+Sample = Tuple[Dict[str, str], float]
+
+# 커넥션 체크아웃 대기 시간 버킷 (pool_timeout 3초 전후까지)
+CHECKOUT_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# SQL 문 실행 시간 버킷
+STATEMENT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CallbackMetric(Collector):
+    """조회 시점에 callback으로 값을 계산하는 메트릭 (다른 모듈의 stats() 노출용)"""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        callback: Callable[[], Iterable[Sample]],
+        labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+    
+    def collect(self) -> Iterator:
+        if self.metric_type == "counter":
+            family = CounterMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        else:
+            family = GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        try:
+            for labels, value in self.callback():
+                family.add_metric([str(labels[name]) for name in self.labelnames], value)
+        except Exception as e:
+            logger.warning(f"Failed to collect metric {self.name}: {e}")
+            return
+        yield family
+
+
+# 전역 메트릭 레지스트리 (prometheus_client 기본 레지스트리의 프로세스/플랫폼 지표는 노출하지 않음)
+metrics_registry = CollectorRegistry()
+
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (includes opening a new one)",
+    ["engine"],
+    buckets=CHECKOUT_WAIT_BUCKETS,
+    registry=metrics_registry
+)
+db_pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that failed because pool_size + max_overflow connections were in use for pool_timeout",
+    ["engine"],
+    registry=metrics_registry
+)
+db_pool_connections_opened = Counter(
+    "db_pool_connections_opened",
+    "New DBAPI connections opened by the pool",
+    ["engine"],
+    registry=metrics_registry
+)
+db_pool_connections_closed = Counter(
+    "db_pool_connections_closed",
+    "DBAPI connections closed by the pool (reason=recycle when closed after pool_recycle)",
+    ["engine", "reason"],
+    registry=metrics_registry
+)
+db_pool_invalidations = Counter(
+    "db_pool_invalidations",
+    "Connections invalidated (pre-ping failure, disconnect errors)",
+    ["engine"],
+    registry=metrics_registry
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time",
+    ["engine", "operation"],
+    buckets=STATEMENT_BUCKETS,
+    registry=metrics_registry
+)
+db_statement_errors = Counter(
+    "db_statement_errors",
+    "SQL statements that raised an error",
+    ["engine", "operation"],
+    registry=metrics_registry
+)
+
+# 계측 중인 엔진 (이름 -> 엔진)
+_engines: Dict[str, AsyncEngine] = {}
+
+
+def _pool_samples(read: Callable[[QueuePool], float]) -> Callable[[], Iterable[Sample]]:
+    def collect() -> Iterator[Sample]:
+        for name, async_engine in list(_engines.items()):
+            pool = async_engine.sync_engine.pool
+            if isinstance(pool, QueuePool):
+                yield {"engine": name}, read(pool)
+    return collect
+
+
+metrics_registry.register(CallbackMetric(
+    "db_pool_size", "Configured pool_size", "gauge",
+    _pool_samples(lambda pool: pool.size()),
+    labelnames=["engine"]
+))
+metrics_registry.register(CallbackMetric(
+    "db_pool_max_overflow", "Configured max_overflow", "gauge",
+    _pool_samples(lambda pool: pool._max_overflow),
+    labelnames=["engine"]
+))
+metrics_registry.register(CallbackMetric(
+    "db_pool_checked_out_connections", "Connections currently checked out (in use)", "gauge",
+    _pool_samples(lambda pool: pool.checkedout()),
+    labelnames=["engine"]
+))
+metrics_registry.register(CallbackMetric(
+    "db_pool_checked_in_connections", "Idle connections in the pool", "gauge",
+    _pool_samples(lambda pool: pool.checkedin()),
+    labelnames=["engine"]
+))
+metrics_registry.register(CallbackMetric(
+    "db_pool_overflow_connections", "Connections open beyond pool_size", "gauge",
+    _pool_samples(lambda pool: max(0, pool.overflow())),
+    labelnames=["engine"]
+))
+
+
+class _TimedPoolMixin:
+    """커넥션 체크아웃 대기 시간과 pool_timeout 초과를 기록하는 풀"""
+    
+    metrics_name = "unknown"
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            db_pool_checkout_timeouts.labels(engine=self.metrics_name).inc()
+            logger.warning(f"Database pool exhausted ({self.metrics_name}) after {time.perf_counter() - start:.2f}s")
+            raise
+        db_pool_checkout_wait.labels(engine=self.metrics_name).observe(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool_class(base: Type[Pool], name: str) -> Type[Pool]:
+    """
+    체크아웃 대기 시간을 기록하는 풀 클래스 생성 (create_async_engine의 poolclass로 사용)
+    
+    엔진 dispose 시 풀은 같은 클래스로 다시 만들어지므로 엔진 이름을 클래스 속성으로 둡니다.
+    """
+    return type(f"Timed{base.__name__}", (_TimedPoolMixin, base), {"metrics_name": name})
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(async_engine: AsyncEngine, name: str) -> None:
+    """
+    엔진에 커넥션 풀 / SQL 실행 시간 이벤트 리스너 등록
+    
+    Args:
+        async_engine: 계측할 엔진
+        name: 메트릭 engine 라벨 (primary, replica-0, ...)
+    """
+    _engines[name] = async_engine
+    sync_engine = async_engine.sync_engine
+    
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        db_pool_connections_opened.labels(engine=name).inc()
+    
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        # pool_recycle이 지나 교체되는 연결인지 구분 (get_connection의 recycle 조건과 동일)
+        recycle = sync_engine.pool._recycle
+        starttime = getattr(connection_record, "starttime", None)
+        expired = recycle > -1 and starttime is not None and time.time() - starttime > recycle
+        db_pool_connections_closed.labels(engine=name, reason="recycle" if expired else "other").inc()
+    
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        db_pool_invalidations.labels(engine=name).inc()
+    
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            db_statement_duration.labels(engine=name, operation=_operation(statement)).observe(
+                time.perf_counter() - starts.pop()
+            )
+    
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        try:
+            starts = context.connection.info.get("query_start") if context.connection is not None else None
+        except exc.ResourceClosedError:
+            starts = None
+        if starts:
+            starts.pop()
+        if context.statement:
+            db_statement_errors.labels(engine=name, operation=_operation(context.statement)).inc()
@@ -0,0 +1,110 @@
+"""
+Keyset (cursor) pagination utilities
+offset 대신 마지막 행의 정렬 키를 기준으로 다음 페이지를 조회
+
+커서는 정렬 키 값을 담은 불투명한 문자열(base64url JSON)이며,
+다음 페이지 커서는 응답 헤더(X-Next-Cursor)로 전달합니다. (응답 본문 형식은 기존 목록 그대로 유지)
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Sequence, Tuple, TypeVar
+from fastapi import HTTPException, Response, status
+from sqlalchemy import String, type_coerce
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def encode_cursor(kind: str, *values: Any) -> str:
+    """
+    정렬 키 값을 커서 문자열로 인코딩
+    
+    Args:
+        kind: 커서를 발급한 목록 종류 (다른 엔드포인트의 커서 사용 방지)
+        values: 마지막 행의 정렬 키 값
+    """
+    payload = json.dumps([kind, *values], default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, kind: str, converters: Sequence[Callable[[Any], Any]]) -> Tuple[Any, ...]:
+    """
+    커서 문자열을 정렬 키 값으로 디코딩
+    
+    Args:
+        cursor: encode_cursor로 발급한 커서
+        kind: 기대하는 목록 종류
+        converters: 값별 변환 함수 (예: stored_datetime, int)
+    
+    Raises:
+        HTTPException: 형식이 잘못되었거나 다른 목록의 커서인 경우 (400)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or payload[0] != kind or len(payload) != len(converters) + 1:
+            raise ValueError("cursor kind mismatch")
+        return tuple(convert(value) for convert, value in zip(converters, payload[1:]))
+    except (ValueError, TypeError, IndexError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def stored_key(column):
+    """
+    datetime 정렬 키를 DB에 저장된 값 그대로 조회/비교하는 표현식
+    
+    SQLite는 DateTime을 텍스트로 저장하며, CURRENT_TIMESTAMP(server_default)는 'YYYY-MM-DD HH:MM:SS',
+    애플리케이션에서 넣은 값은 마이크로초까지 포함합니다. datetime으로 바인딩하면 형식이 달라
+    커서의 마지막 행이 다시 조회될 수 있으므로, 커서에 저장된 문자열을 담고 같은 문자열로 비교합니다.
+    (MySQL은 DATETIME 컬럼과 문자열을 비교할 때 값을 변환하며 인덱스를 그대로 사용)
+    """
+    return type_coerce(column, String)
+
+
+def stored_value(value: Any) -> str:
+    """stored_key로 조회한 값을 커서에 담을 문자열로 변환 (MySQL 드라이버는 datetime으로 반환)"""
+    return value if isinstance(value, str) else str(value)
+
+
+def stored_datetime(value: Any) -> str:
+    """커서의 datetime 문자열 검증 (decode_cursor 변환 함수, 저장된 형식 그대로 반환)"""
+    datetime.fromisoformat(value)
+    return value
+
+
+def paginate(
+    rows: List[T],
+    limit: int,
+    response: Response,
+    kind: str,
+    key: Callable[[T], Tuple[Any, ...]]
+) -> List[T]:
+    """
+    limit + 1개로 조회한 결과를 limit개로 자르고, 다음 페이지가 있으면 X-Next-Cursor 헤더 설정
+    
+    Args:
+        rows: limit + 1개까지 조회한 행
+        limit: 페이지 크기
+        response: 헤더를 설정할 응답
+        kind: 커서 종류
+        key: 행의 정렬 키 값
+    
+    Returns:
+        현재 페이지 행
+    """
+    page = rows[:limit]
+    if len(rows) > limit and page:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(kind, *key(page[-1]))
+    return page
@@ -0,0 +1,188 @@
+"""
+Schema version check
+기동 시 DB의 Alembic 리비전이 코드의 마이그레이션 head와 일치하는지 확인
+
+테이블을 리플렉션하는 create_all 대신 alembic_version 조회 한 번으로 확인하며,
+마이그레이션은 별도의 일회성 명령(scripts/migrate.py)으로 실행합니다.
+
+SCHEMA_CHECK_MODE:
+- fail (기본): 스키마가 맞지 않거나 DB에 연결할 수 없으면 기동 실패 (파드 재시작)
+- readonly: DB가 head 바로 이전 리비전이고 head 마이그레이션이 read_compatible(읽기 경로가 의존하지 않음)인
+  경우에만 기동하여 쓰기 요청을 503으로 거절하고 레디니스를 실패시키며, SCHEMA_RECHECK_SECONDS 간격으로 다시 확인.
+  그 밖의 불일치는 fail과 같이 기동 실패
+- skip: 검사하지 않음
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, Tuple
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic")
+
+SCHEMA_CHECK_MODES = ("fail", "readonly", "skip")
+
+# 읽기 전용 모드에서도 허용하는 요청
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# 로그인/토큰 갱신은 POST지만 DB에 쓰지 않음 (root_path 유무와 관계없이 경로 끝으로 비교)
+_READ_ONLY_ALLOWED_PATHS = ("/auth/login", "/auth/refresh")
+
+
+def get_script_directory() -> ScriptDirectory:
+    """코드에 포함된 Alembic 마이그레이션 디렉토리"""
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    return ScriptDirectory.from_config(config)
+
+
+class SchemaGuard:
+    """DB 스키마 리비전 확인 및 읽기 전용 상태 관리"""
+    
+    def __init__(self, mode: str, recheck_seconds: float):
+        if mode not in SCHEMA_CHECK_MODES:
+            logger.warning(f"알 수 없는 SCHEMA_CHECK_MODE '{mode}', fail 모드를 사용합니다.")
+            mode = "fail"
+        self.mode = mode
+        self.recheck_seconds = recheck_seconds
+        self.script = get_script_directory()
+        self.head: Optional[str] = self.script.get_current_head()
+        self.current: Optional[str] = None
+        self.writable = True
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    @staticmethod
+    async def _current_revision() -> Optional[str]:
+        """DB에 기록된 리비전 (alembic_version 테이블이 없으면 None)"""
+        async with engine.connect() as conn:
+            try:
+                return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+            except (OperationalError, ProgrammingError) as e:
+                if e.connection_invalidated:
+                    raise
+                return None
+    
+    def _is_compatible(self, revision: Optional[str]) -> bool:
+        """
+        DB 리비전으로 이 코드가 동작할 수 있는지 여부
+        
+        코드가 모르는 리비전은 롤아웃 중 마이그레이션이 먼저 적용된 경우(이전 버전 파드)이므로
+        하위 호환 마이그레이션(expand/contract)을 전제로 허용합니다.
+        """
+        if revision is None:
+            return False
+        if revision == self.head:
+            return True
+        try:
+            self.script.get_revision(revision)
+        except CommandError:
+            logger.warning(f"Database schema revision {revision} is newer than code head {self.head}")
+            return True
+        return False
+    
+    def _read_only_allowed(self, revision: Optional[str]) -> bool:
+        """
+        읽기 전용으로 계속 실행할 수 있는 리비전인지 여부
+        
+        head 바로 이전 리비전이고, head 마이그레이션이 읽기 경로에 필요 없는 변경(read_compatible = True,
+        예: 인덱스 추가)인 경우만 허용합니다. 새 테이블처럼 조회에 필요한 변경이 빠져 있으면 읽기도 실패하므로 허용하지 않습니다.
+        """
+        if revision is None or self.head is None:
+            return False
+        head = self.script.get_revision(self.head)
+        return head.down_revision == revision and getattr(head.module, "read_compatible", False)
+    
+    async def _evaluate(self) -> Tuple[bool, str]:
+        self._checked_at = time.monotonic()
+        try:
+            self.current = await self._current_revision()
+        except Exception as e:
+            return False, f"Database unavailable: {e}"
+        if self._is_compatible(self.current):
+            return True, f"Database schema at revision {self.current}"
+        return False, (
+            f"Database schema revision {self.current or '(none)'} does not match code head {self.head}. "
+            "Run `python scripts/migrate.py`."
+        )
+    
+    async def check(self) -> None:
+        """
+        기동 시 스키마 확인
+        
+        Raises:
+            RuntimeError: 스키마가 맞지 않거나 DB에 연결할 수 없는 경우
+                (readonly 모드에서 읽기 전용으로 실행할 수 있는 리비전이면 제외)
+        """
+        if self.mode == "skip":
+            print("ℹ️  Schema check skipped (SCHEMA_CHECK_MODE=skip)")
+            return
+        ok, reason = await self._evaluate()
+        if ok:
+            self.writable = True
+            print(f"✅ {reason}")
+            return
+        if self.mode == "fail":
+            raise RuntimeError(reason)
+        if not self._read_only_allowed(self.current):
+            raise RuntimeError(
+                f"{reason} Read-only mode is only possible one read-compatible revision behind head."
+            )
+        self.writable = False
+        print(f"⚠️  {reason}")
+        print("   Application will continue in read-only mode (not ready).")
+    
+    async def ensure_writable(self) -> bool:
+        """쓰기 가능 여부 (읽기 전용이면 recheck_seconds 간격으로 다시 확인, 레디니스 체크에도 사용)"""
+        if self.writable:
+            return True
+        if time.monotonic() - self._checked_at < self.recheck_seconds:
+            return False
+        async with self._lock:
+            if not self.writable and time.monotonic() - self._checked_at >= self.recheck_seconds:
+                ok, reason = await self._evaluate()
+                if ok:
+                    self.writable = True
+                    logger.warning(f"{reason}; leaving read-only mode")
+        return self.writable
+
+
+class ReadOnlyModeMiddleware:
+    """스키마가 맞지 않는 동안 쓰기 요청(POST/PUT/PATCH/DELETE)을 503으로 거절"""
+    
+    def __init__(self, app: ASGIApp, guard: "SchemaGuard"):
+        self.app = app
+        self.guard = guard
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["method"] not in _SAFE_METHODS
+            and not scope["path"].rstrip("/").endswith(_READ_ONLY_ALLOWED_PATHS)
+            and not await self.guard.ensure_writable()
+        ):
+            response = JSONResponse(
+                {"detail": "Service is temporarily read-only: database schema is not up to date"},
+                status_code=503,
+                headers={"Retry-After": str(max(1, int(self.guard.recheck_seconds)))}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# 전역 스키마 검사기
+schema_guard = SchemaGuard(
+    mode=settings.SCHEMA_CHECK_MODE,
+    recheck_seconds=settings.SCHEMA_RECHECK_SECONDS
+)
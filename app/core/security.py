@@ -2,13 +2,33 @@
 JWT verification utilities
 Keycloak에서 발급한 JWT 토큰 검증만 담당
 """
-from typing import Optional
-from fastapi import HTTPException, status
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
 import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.database import get_db
+from app.core.shm_cache import SharedMemoryCache
 from app.services.auth import auth_service
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# 공유 캐시에 JWKS를 저장할 때 사용하는 키
+_SHARED_JWKS_KEY = "jwks"
 
 
 security = HTTPBearer(
@@ -16,53 +36,412 @@ security = HTTPBearer(
     description="JWT 토큰을 입력하세요. Keycloak에서 발급받은 토큰을 사용합니다."
 )
 
-# 공개 키 캐시
-_cached_public_key: Optional[str] = None
+
+class JWKSKeyStore:
+    """
+    kid 기준 JWKS 공개 키 저장소
+    
+    최초 요청 시 한 번 채우고, 이후에는 TTL 주기로 백그라운드에서 갱신합니다.
+    저장소에 없는 kid가 들어온 경우(키 로테이션)에만 Keycloak에서 다시 가져옵니다.
+    TTL이 지났더라도 유예 시간(stale grace) 이내라면 기존 키로 검증을 계속하고
+    갱신은 백그라운드에서 진행하므로, Keycloak이 잠시 느려도 요청이 막히지 않습니다.
+    동시 재조회는 AuthService의 single-flight로 한 번의 요청으로 합쳐집니다.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: int,
+        min_refetch_interval: float,
+        stale_grace_seconds: float,
+        shared_cache: Optional[SharedMemoryCache] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.min_refetch_interval = min_refetch_interval
+        self.stale_grace_seconds = stale_grace_seconds
+        # 워커 간 공유 캐시 (있으면 다른 워커가 가져온 JWKS를 재사용)
+        self.shared_cache = shared_cache
+        self._keys: Dict[str, Any] = {}
+        self._default_kid: Optional[str] = None
+        self._fetched_at: float = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._revalidate_task: Optional[asyncio.Task] = None
+        # 키 집합이 바뀌었을 때 호출할 콜백 (예: 검증된 토큰 캐시 무효화)
+        self._on_change: List[Callable[[], None]] = []
+    
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """키 집합 변경 시 호출될 콜백 등록"""
+        self._on_change.append(callback)
+    
+    def _age(self) -> float:
+        return time.monotonic() - self._fetched_at
+    
+    def _is_fresh(self) -> bool:
+        """TTL 이내에 가져온 키가 있는지 여부"""
+        return bool(self._keys) and self._age() < self.ttl_seconds
+    
+    def _is_usable_stale(self) -> bool:
+        """TTL은 지났지만 유예 시간 이내인 키가 있는지 여부"""
+        return bool(self._keys) and self._age() < self.ttl_seconds + self.stale_grace_seconds
+    
+    def _background_running(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+    
+    async def refresh(self, force: bool = False) -> None:
+        """
+        JWKS를 다시 가져와 저장소를 교체합니다.
+        
+        Args:
+            force: True면 공유 캐시를 건너뛰고 Keycloak에서 직접 가져옴
+        """
+        shared = None if force else self._load_shared()
+        if shared:
+            self._apply(*shared)
+            return
+        keys = await auth_service.get_jwks()
+        if not keys:
+            raise ValueError("No signing keys in Keycloak JWKS")
+        fetched_at = time.time()
+        self._apply(keys, fetched_at)
+        self._store_shared(keys, fetched_at)
+    
+    def _apply(self, keys: Dict[str, Any], fetched_at: float) -> None:
+        # 처음 불러온 경우는 변경이 아님 (이미 불러온 키 집합이 바뀐 경우에만 알림)
+        changed = bool(self._keys) and self._fingerprint(keys) != self._fingerprint(self._keys)
+        self._keys = keys
+        self._default_kid = next(iter(keys))
+        self._fetched_at = time.monotonic() - max(0.0, time.time() - fetched_at)
+        if changed:
+            for callback in self._on_change:
+                callback()
+    
+    def _load_shared(self):
+        """공유 캐시에서 TTL 이내의 JWKS 로드 (없으면 None)"""
+        if self.shared_cache is None:
+            return None
+        entry = self.shared_cache.get(_SHARED_JWKS_KEY)
+        if not entry or time.time() - entry["fetched_at"] >= self.ttl_seconds:
+            return None
+        try:
+            keys = {
+                kid: rsa.RSAPublicNumbers(e, int(n, 16)).public_key()
+                for kid, (n, e) in entry["keys"].items()
+            }
+        except Exception:
+            return None
+        return (keys, entry["fetched_at"]) if keys else None
+    
+    def _store_shared(self, keys: Dict[str, Any], fetched_at: float) -> None:
+        if self.shared_cache is None:
+            return
+        entry = {"fetched_at": fetched_at, "keys": {}}
+        for kid, key in keys.items():
+            numbers = key.public_numbers()
+            entry["keys"][kid] = [format(numbers.n, "x"), numbers.e]
+        self.shared_cache.set(
+            _SHARED_JWKS_KEY,
+            entry,
+            expires_at=fetched_at + self.ttl_seconds + self.stale_grace_seconds,
+            # 토큰 캐시와 같은 공유 메모리를 쓰므로 clear()(키 변경 시 토큰 무효화)에 지워지지 않도록 보관
+            persistent=True
+        )
+    
+    @staticmethod
+    def _fingerprint(keys: Dict[str, Any]) -> Dict[str, Any]:
+        return {kid: key.public_numbers() for kid, key in keys.items()}
+    
+    async def _safe_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"JWKS 갱신 실패 (기존 키 유지, age={self._age():.0f}s): {e}")
+    
+    def _revalidate_in_background(self) -> None:
+        """유예 구간의 키를 사용하는 동안 백그라운드에서 갱신"""
+        if self._revalidate_task is None or self._revalidate_task.done():
+            self._revalidate_task = asyncio.create_task(self._safe_refresh())
+    
+    async def get_key(self, kid: Optional[str] = None) -> Any:
+        """
+        kid에 해당하는 공개 키 반환
+        
+        Args:
+            kid: Key ID (JWT 헤더에서 추출). None이면 기본 서명용 키 사용
+        
+        Returns:
+            파싱된 RSAPublicKey 객체
+        
+        Raises:
+            KeyError: 재조회 후에도 kid에 해당하는 키가 없는 경우
+        """
+        if not self._is_fresh():
+            if self._is_usable_stale():
+                # stale-while-revalidate: 기존 키로 계속 검증
+                if not self._background_running():
+                    self._revalidate_in_background()
+            else:
+                await self.refresh()
+        
+        if not kid:
+            return self._keys[self._default_kid]
+        
+        key = self._keys.get(kid)
+        if key:
+            return key
+        
+        # 다른 워커가 이미 새 키를 가져왔을 수 있으므로 공유 캐시 먼저 확인
+        shared = self._load_shared()
+        if shared and kid in shared[0]:
+            self._apply(*shared)
+            return self._keys[kid]
+        
+        # 모르는 kid: 키 로테이션일 수 있으므로 재조회 (과도한 재조회는 간격으로 제한)
+        if self._age() >= self.min_refetch_interval:
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        if not key:
+            raise KeyError(kid)
+        return key
+    
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds)
+            await self._safe_refresh()
+    
+    def start(self) -> None:
+        """백그라운드 갱신 태스크 시작"""
+        if not auth_service.get_public_key_url() or self._background_running():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """백그라운드 갱신 태스크 종료"""
+        for task in (self._refresh_task, self._revalidate_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._revalidate_task = None
+
+
+class JWTVerifier:
+    """
+    JWT 검증기 기본 클래스
+    파싱된 공개 키 객체로 서명과 클레임(exp, iss)을 검증합니다.
+    """
+    
+    name = "base"
+    
+    def verify(self, token: str, public_key: Any, issuer: str) -> dict:
+        """
+        토큰 검증
+        
+        Args:
+            token: JWT 문자열
+            public_key: RSAPublicKey 객체
+            issuer: 기대하는 iss 값
+        
+        Returns:
+            디코딩된 토큰 페이로드
+        
+        Raises:
+            JWTError: 토큰이 유효하지 않은 경우
+        """
+        raise NotImplementedError
+
+
+class JoseJWTVerifier(JWTVerifier):
+    """python-jose 기반 검증기"""
+    
+    name = "jose"
+    
+    def verify(self, token: str, public_key: Any, issuer: str) -> dict:
+        # audience 검증 비활성화 - Keycloak의 account audience 사용
+        return jwt.decode(
+            token,
+            public_key,
+            algorithms=[settings.JWT_ALGORITHM],
+            options={"verify_signature": True, "verify_exp": True, "verify_iss": True, "verify_aud": False},
+            issuer=issuer
+        )
+
+
+class CryptographyJWTVerifier(JWTVerifier):
+    """
+    cryptography 직접 호출 검증기 (RS256/RS384/RS512)
+    python-jose의 키 래핑/JWK 처리 단계를 건너뛰고 공개 키 객체로 바로 서명을 검증합니다.
+    """
+    
+    name = "cryptography"
+    
+    _HASHES = {
+        "RS256": hashes.SHA256,
+        "RS384": hashes.SHA384,
+        "RS512": hashes.SHA512,
+    }
+    
+    @staticmethod
+    def _b64decode(segment: str) -> bytes:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    
+    def verify(self, token: str, public_key: Any, issuer: str) -> dict:
+        try:
+            signing_input, signature_segment = token.rsplit(".", 1)
+            header_segment, payload_segment = signing_input.split(".", 1)
+            header = json.loads(self._b64decode(header_segment))
+            signature = self._b64decode(signature_segment)
+        except Exception:
+            raise JWTError("Error decoding token headers.")
+        
+        alg = header.get("alg")
+        if alg != settings.JWT_ALGORITHM or alg not in self._HASHES:
+            raise JWTError("The specified alg value is not allowed")
+        
+        try:
+            public_key.verify(
+                signature,
+                signing_input.encode("ascii"),
+                padding.PKCS1v15(),
+                self._HASHES[alg]()
+            )
+        except InvalidSignature:
+            raise JWTError("Signature verification failed.")
+        
+        try:
+            payload = json.loads(self._b64decode(payload_segment))
+        except Exception:
+            raise JWTError("Invalid payload string")
+        if not isinstance(payload, dict):
+            raise JWTError("Invalid payload string: must be a json object")
+        
+        now = time.time()
+        exp = payload.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise JWTClaimsError("Expiration Time claim (exp) must be an integer.")
+            if exp <= now:
+                raise ExpiredSignatureError("Signature has expired.")
+        nbf = payload.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+        if payload.get("iss") != issuer:
+            raise JWTClaimsError("Invalid issuer")
+        return payload
+
+
+# 선택 가능한 검증기 (JWT_VERIFIER_BACKEND)
+JWT_VERIFIERS: Dict[str, Type[JWTVerifier]] = {
+    JoseJWTVerifier.name: JoseJWTVerifier,
+    CryptographyJWTVerifier.name: CryptographyJWTVerifier,
+}
 
 
-async def _get_public_key(kid: Optional[str] = None) -> str:
+def get_jwt_verifier(name: str) -> JWTVerifier:
     """
-    Keycloak에서 공개 키를 가져옵니다 (캐시 사용)
+    이름으로 JWT 검증기 생성 (알 수 없는 이름이면 python-jose 사용)
     
     Args:
-        kid: Key ID (JWT 헤더에서 추출)
+        name: 검증기 이름 ("jose", "cryptography")
     
     Returns:
-        PEM 형식의 공개 키
+        JWTVerifier 인스턴스
+    """
+    verifier_cls = JWT_VERIFIERS.get(name)
+    if verifier_cls is None:
+        logger.warning(f"알 수 없는 JWT_VERIFIER_BACKEND '{name}', jose 검증기를 사용합니다.")
+        verifier_cls = JoseJWTVerifier
+    return verifier_cls()
+
+
+def _create_shared_cache() -> Optional[SharedMemoryCache]:
+    """TOKEN_CACHE_BACKEND가 "shm"이면 워커 간 공유 캐시 생성 (실패 시 None)"""
+    if settings.TOKEN_CACHE_BACKEND != "shm":
+        return None
+    try:
+        return SharedMemoryCache(
+            settings.SHARED_CACHE_PATH,
+            slots=settings.SHARED_CACHE_SLOTS,
+            slot_size=settings.SHARED_CACHE_SLOT_SIZE
+        )
+    except Exception as e:
+        logger.warning(f"공유 메모리 캐시 초기화 실패, 프로세스 내 캐시를 사용합니다: {e}")
+        return None
+
+
+# 워커 간 공유 캐시 (TOKEN_CACHE_BACKEND=shm인 경우)
+shared_cache = _create_shared_cache()
+
+# 전역 JWKS 키 저장소
+jwks_key_store = JWKSKeyStore(
+    ttl_seconds=settings.JWKS_CACHE_TTL_SECONDS,
+    min_refetch_interval=settings.JWKS_MIN_REFETCH_INTERVAL_SECONDS,
+    stale_grace_seconds=settings.JWKS_STALE_GRACE_SECONDS,
+    shared_cache=shared_cache
+)
+
+# 전역 JWT 검증기
+jwt_verifier = get_jwt_verifier(settings.JWT_VERIFIER_BACKEND)
+
+# 검증된 토큰 캐시: 토큰 digest -> 페이로드 (토큰의 exp까지 유지)
+# 같은 토큰의 반복 요청은 RSA 검증 대신 해시 조회로 처리
+token_cache: Union[TTLCache, SharedMemoryCache] = (
+    shared_cache if shared_cache is not None else TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+)
+
+# JWKS 키 집합이 바뀌면 이전 키로 검증된 토큰을 모두 무효화
+jwks_key_store.add_change_listener(token_cache.clear)
+
+# .env에 설정된 공개 키 (한 번만 파싱)
+_configured_public_key: Optional[Any] = None
+
+
+def _get_configured_public_key() -> Optional[Any]:
+    """.env에 설정된 공개 키 반환 (올바른 PEM 형식인 경우만, 파싱 결과 캐시)"""
+    global _configured_public_key
+    if _configured_public_key is None and settings.JWT_PUBLIC_KEY and "BEGIN PUBLIC KEY" in settings.JWT_PUBLIC_KEY:
+        pem = settings.JWT_PUBLIC_KEY.replace('\\n', '\n')
+        try:
+            _configured_public_key = serialization.load_pem_public_key(pem.encode())
+        except ValueError as e:
+            logger.warning(f"JWT_PUBLIC_KEY 파싱 실패, Keycloak JWKS를 사용합니다: {e}")
+    return _configured_public_key
+
+
+async def _get_public_key(kid: Optional[str] = None) -> Any:
     """
-    global _cached_public_key
+    공개 키를 가져옵니다 (kid 기준 JWKS 캐시 사용)
     
-    # kid가 제공된 경우 캐시를 사용하지 않고 항상 최신 키 가져오기
-    # (Keycloak이 키를 로테이션할 수 있으므로)
-    if not kid:
-        # 캐시된 키가 있으면 사용
-        if _cached_public_key:
-            return _cached_public_key
+    Args:
+        kid: Key ID (JWT 헤더에서 추출)
     
+    Returns:
+        파싱된 RSAPublicKey 객체
+    """
     # .env에 설정된 키가 있고 유효하면 사용 (선택사항)
-    if settings.JWT_PUBLIC_KEY and settings.JWT_PUBLIC_KEY.strip():
-        # .env의 키가 올바른 형식인지 확인
-        if "BEGIN PUBLIC KEY" in settings.JWT_PUBLIC_KEY:
-            _cached_public_key = settings.JWT_PUBLIC_KEY.replace('\\n', '\n')
-            return _cached_public_key
+    configured_key = _get_configured_public_key()
+    if configured_key is not None:
+        return configured_key
+    
+    if not auth_service.get_public_key_url():
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="JWT public key not available. Please ensure Keycloak is accessible."
+        )
     
-    # Keycloak에서 동적으로 가져오기 (기본 방법)
     try:
-        public_key = await auth_service.get_public_key(kid)
-        if public_key:
-            if not kid:
-                _cached_public_key = public_key
-            return public_key
+        return await jwks_key_store.get_key(kid)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: unknown signing key"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch public key from Keycloak: {str(e)}"
         )
-    
-    raise HTTPException(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        detail="JWT public key not available. Please ensure Keycloak is accessible."
-    )
 
 
 async def verify_token(credentials: HTTPAuthorizationCredentials) -> dict:
@@ -81,6 +460,13 @@ async def verify_token(credentials: HTTPAuthorizationCredentials) -> dict:
     """
     token = credentials.credentials
     
+    # 이미 검증된 토큰이면 캐시된 페이로드 반환
+    cache_key = hashlib.sha256(token.encode()).digest() if settings.TOKEN_CACHE_ENABLED else None
+    if cache_key is not None:
+        cached_payload = token_cache.get(cache_key)
+        if cached_payload is not None:
+            return dict(cached_payload)
+    
     # JWT 헤더에서 kid 추출
     try:
         unverified_header = jwt.get_unverified_header(token)
@@ -95,50 +481,58 @@ async def verify_token(credentials: HTTPAuthorizationCredentials) -> dict:
     expected_issuer = f"{auth_service.keycloak_url}/realms/{auth_service.realm}"
     
     try:
-        # JWT 토큰 검증 (audience 검증 비활성화 - Keycloak의 account audience 사용)
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=[settings.JWT_ALGORITHM],
-            options={"verify_signature": True, "verify_exp": True, "verify_iss": True, "verify_aud": False},
-            issuer=expected_issuer
-        )
-        return payload
+        payload = jwt_verifier.verify(token, public_key, expected_issuer)
     except JWTError as e:
-        # 서명 검증 실패 시 캐시 초기화하고 재시도 (다른 kid로)
-        global _cached_public_key
-        if "Signature verification failed" in str(e) or "Invalid issuer" in str(e):
-            _cached_public_key = None
-            try:
-                # kid 없이 다시 시도 (서명용 키 자동 선택)
-                public_key = await _get_public_key(None)
-                payload = jwt.decode(
-                    token,
-                    public_key,
-                    algorithms=[settings.JWT_ALGORITHM],
-                    options={"verify_signature": True, "verify_exp": True, "verify_iss": True, "verify_aud": False},
-                    issuer=expected_issuer
-                )
-                return payload
-            except JWTError:
-                pass
-        
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}"
         )
+    
+    # exp가 있는 토큰만 캐시 (만료 시각까지만 유지)
+    if cache_key is not None and isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(cache_key, dict(payload), expires_at=payload["exp"])
+    return payload
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = security) -> dict:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
     """
-    현재 사용자 정보 추출
-    JWT 토큰에서 사용자 정보를 추출합니다.
+    현재 사용자 정보 추출 (의존성 주입)
+    JWT 토큰을 검증하고 페이로드를 반환합니다.
+    FastAPI 의존성 캐시로 요청당 한 번만 검증됩니다.
     
     Args:
         credentials: HTTP Bearer 토큰
         
     Returns:
-        사용자 정보 딕셔너리
+        사용자 정보 딕셔너리 (JWT 페이로드)
+    """
+    return await verify_token(credentials)
+
+
+async def get_current_user_id(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> int:
+    """
+    현재 사용자의 DB user_id 추출 (의존성 주입)
+    JWT의 email로 DB user_id를 요청당 한 번만 조회합니다 ((sub, email) -> user_id 캐시 사용).
+    
+    Args:
+        current_user: JWT 페이로드
+        db: 데이터베이스 세션
+    
+    Returns:
+        DB user_id
+    
+    Raises:
+        HTTPException: DB에 등록되지 않은 사용자인 경우
     """
-    # verify_token은 async이므로 의존성 주입에서 사용
-    pass
+    user_id = await UserService.get_user_id_from_jwt(db, current_user)
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found in database. Please register first."
+        )
+    return user_id
@@ -0,0 +1,252 @@
+"""
+Shared-memory cache
+같은 노드의 uvicorn 워커들이 공유하는 memory-mapped 파일 기반 캐시
+
+- 고정 크기 슬롯의 해시 테이블 (open addressing, 제한된 probe)
+- 항목별 만료 시각
+- 읽기는 락 없이 seqlock(슬롯별 시퀀스 번호)으로 일관성 확인
+- 쓰기는 파일 락(fcntl.flock)으로 프로세스 간 직렬화
+- clear()는 세대(generation) 번호를 올려 모든 항목을 한 번에 무효화
+  (persistent로 저장한 항목은 세대와 관계없이 만료 시각까지 유지)
+"""
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Hashable, Optional
+
+_MAGIC = b"BKSHMC01"
+# magic, slots, slot_size, generation
+_HEADER = struct.Struct("<8sIIQ")
+_HEADER_SIZE = 64
+# seq, generation, expires_at, key digest, length
+_SLOT_HEADER = struct.Struct("<QQd16sI4x")
+_SEQ = struct.Struct("<Q")
+_PROBES = 4
+# persistent 항목의 세대 번호 (세대는 1부터 시작하므로 clear()에 무효화되지 않음)
+_PERSISTENT_GENERATION = 0
+_READ_RETRIES = 3
+
+
+class SharedMemoryCache:
+    """
+    워커 간 공유 캐시 (TTLCache와 같은 get/set/delete/clear 인터페이스)
+    
+    값은 JSON으로 직렬화되며, 슬롯 크기를 넘는 값은 캐시하지 않습니다.
+    """
+    
+    def __init__(self, path: str, slots: int = 4096, slot_size: int = 4096):
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError("slot_size too small")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.maxsize = slots
+        self._capacity = slot_size - _SLOT_HEADER.size
+        self._size = _HEADER_SIZE + slots * slot_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._write_lock():
+                if os.fstat(self._fd).st_size < self._size:
+                    os.ftruncate(self._fd, self._size)
+                self._mm = mmap.mmap(self._fd, self._size)
+                magic, file_slots, file_slot_size, _ = _HEADER.unpack_from(self._mm, 0)
+                if (magic, file_slots, file_slot_size) != (_MAGIC, slots, slot_size):
+                    # 새 파일이거나 다른 설정으로 만든 파일: 초기화
+                    self._mm[:self._size] = bytes(self._size)
+                    _HEADER.pack_into(self._mm, 0, _MAGIC, slots, slot_size, 1)
+        except Exception:
+            os.close(self._fd)
+            raise
+    
+    def _write_lock(self):
+        return _FileLock(self._fd)
+    
+    @staticmethod
+    def _digest(key: Hashable) -> bytes:
+        if isinstance(key, str):
+            key = key.encode()
+        elif not isinstance(key, bytes):
+            key = repr(key).encode()
+        return hashlib.blake2b(key, digest_size=16).digest()
+    
+    def _generation(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[3]
+    
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * self.slot_size
+    
+    def _candidates(self, digest: bytes):
+        start = int.from_bytes(digest[:8], "little") % self.slots
+        for i in range(_PROBES):
+            yield self._offset((start + i) % self.slots)
+    
+    def _read_slot(self, offset: int):
+        """seqlock 읽기: 쓰기 도중이거나 읽는 사이 바뀐 슬롯은 재시도"""
+        for _ in range(_READ_RETRIES):
+            seq1, generation, expires_at, digest, length = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if seq1 & 1:
+                continue
+            data = None
+            if 0 < length <= self._capacity:
+                start = offset + _SLOT_HEADER.size
+                data = self._mm[start:start + length]
+            seq2 = _SEQ.unpack_from(self._mm, offset)[0]
+            if seq1 == seq2:
+                return generation, expires_at, digest, data
+        return None
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        캐시 조회 (락 없이 읽기)
+        
+        Args:
+            key: 캐시 키
+            default: 없거나 만료된 경우 반환할 값
+        
+        Returns:
+            캐시된 값 또는 default
+        """
+        digest = self._digest(key)
+        generation = self._generation()
+        now = time.time()
+        for offset in self._candidates(digest):
+            slot = self._read_slot(offset)
+            if slot is None:
+                continue
+            slot_generation, expires_at, slot_digest, data = slot
+            if slot_digest != digest or slot_generation not in (generation, _PERSISTENT_GENERATION) or data is None:
+                continue
+            if expires_at <= now:
+                break
+            try:
+                value = json.loads(data)
+            except ValueError:
+                break
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+    
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        persistent: bool = False
+    ) -> None:
+        """
+        캐시 저장 (만료 시각 또는 TTL 필수)
+        
+        Args:
+            key: 캐시 키
+            value: JSON 직렬화 가능한 값
+            expires_at: 만료 시각 (epoch 초)
+            ttl_seconds: expires_at이 없을 때 사용할 TTL
+            persistent: True면 clear()에 지워지지 않음 (만료 시각 또는 delete()까지 유지)
+        """
+        if expires_at is None:
+            if ttl_seconds is None:
+                return
+            expires_at = time.time() + ttl_seconds
+        data = json.dumps(value, separators=(",", ":")).encode()
+        if len(data) > self._capacity:
+            return
+        digest = self._digest(key)
+        
+        with self._write_lock():
+            generation = self._generation()
+            now = time.time()
+            candidates = list(self._candidates(digest))
+            target = None
+            target_expires = None
+            # 같은 키가 이미 있으면 그 슬롯을 덮어씀 (중복 항목 방지)
+            for offset in candidates:
+                if _SLOT_HEADER.unpack_from(self._mm, offset)[3] == digest:
+                    target = offset
+                    break
+            if target is None:
+                for offset in candidates:
+                    _, slot_generation, slot_expires, _, length = _SLOT_HEADER.unpack_from(self._mm, offset)
+                    if not (length and slot_generation in (generation, _PERSISTENT_GENERATION) and slot_expires > now):
+                        target = offset
+                        target_expires = None
+                        break
+                    # 모두 사용 중이면 가장 먼저 만료되는 슬롯을 교체
+                    if target is None or slot_expires < target_expires:
+                        target = offset
+                        target_expires = slot_expires
+            if target_expires is not None:
+                self.evictions += 1
+            
+            seq = _SEQ.unpack_from(self._mm, target)[0]
+            _SEQ.pack_into(self._mm, target, seq + 1)
+            start = target + _SLOT_HEADER.size
+            self._mm[start:start + len(data)] = data
+            slot_generation = _PERSISTENT_GENERATION if persistent else generation
+            _SLOT_HEADER.pack_into(self._mm, target, seq + 1, slot_generation, expires_at, digest, len(data))
+            _SEQ.pack_into(self._mm, target, seq + 2)
+    
+    def delete(self, key: Hashable) -> None:
+        """항목 무효화"""
+        digest = self._digest(key)
+        with self._write_lock():
+            for offset in self._candidates(digest):
+                seq, generation, expires_at, slot_digest, length = _SLOT_HEADER.unpack_from(self._mm, offset)
+                if slot_digest == digest and length:
+                    _SEQ.pack_into(self._mm, offset, seq + 1)
+                    _SLOT_HEADER.pack_into(self._mm, offset, seq + 1, generation, 0.0, slot_digest, 0)
+                    _SEQ.pack_into(self._mm, offset, seq + 2)
+    
+    def clear(self) -> None:
+        """전체 무효화 (모든 워커에 즉시 반영)"""
+        with self._write_lock():
+            magic, slots, slot_size, generation = _HEADER.unpack_from(self._mm, 0)
+            _HEADER.pack_into(self._mm, 0, magic, slots, slot_size, generation + 1)
+    
+    def __len__(self) -> int:
+        generation = self._generation()
+        now = time.time()
+        count = 0
+        for index in range(self.slots):
+            _, slot_generation, expires_at, _, length = _SLOT_HEADER.unpack_from(self._mm, self._offset(index))
+            if length and slot_generation in (generation, _PERSISTENT_GENERATION) and expires_at > now:
+                count += 1
+        return count
+    
+    def stats(self) -> Dict[str, int]:
+        """캐시 통계 (hit/miss는 현재 프로세스 기준)"""
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+    
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+class _FileLock:
+    """fcntl.flock 기반 프로세스 간 배타 락"""
+    
+    def __init__(self, fd: int):
+        self._fd = fd
+    
+    def __enter__(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return False
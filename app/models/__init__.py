@@ -4,13 +4,17 @@ Database models
 from app.models.user import User
 from app.models.content import Content
 from app.models.content_like import ContentLike
+from app.models.content_like_counter import ContentLikeCounter
 from app.models.watch_history import WatchHistory
 from app.models.video_asset import VideoAsset
+from app.models.user_provisioning import UserProvisioning
 
 __all__ = [
     "User",
     "Content",
     "ContentLike",
+    "ContentLikeCounter",
     "WatchHistory",
     "VideoAsset",
+    "UserProvisioning",
 ]
\ No newline at end of file
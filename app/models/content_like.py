@@ -2,7 +2,7 @@
 ContentLike model
 좋아요 상세 테이블
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,8 +13,8 @@ class ContentLike(Base):
     __tablename__ = "contents_likes"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    contents_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    contents_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
@@ -25,6 +25,10 @@ class ContentLike(Base):
     # SQLite는 제약조건 이름을 지원하지 않을 수 있으므로 조건부로 설정
     __table_args__ = (
         UniqueConstraint('user_id', 'contents_id', name='unique_user_content_like'),
+        # 컨텐츠별 좋아요 조회용 covering 인덱스 (user_id 단독 조회는 위 unique 키 사용)
+        Index('ix_contents_likes_contents_id_id', 'contents_id', 'id', 'user_id', 'created_at'),
+        # 내 좋아요 목록 (created_at, contents_id) keyset 조회용 covering 인덱스
+        Index('ix_contents_likes_user_created', 'user_id', 'created_at', 'contents_id'),
     ) if __name__ != "__main__" else ()
     
     def __repr__(self):
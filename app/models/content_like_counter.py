@@ -0,0 +1,25 @@
+"""
+ContentLikeCounter model
+컨텐츠 좋아요 수 분산 카운터 테이블
+"""
+from sqlalchemy import Column, Integer, ForeignKey
+from app.core.database import Base
+
+
+class ContentLikeCounter(Base):
+    """
+    컨텐츠 좋아요 수 분산 카운터 모델
+    
+    좋아요/취소 시 contents 행 대신 컨텐츠별 N개(LIKE_COUNTER_SHARDS) 중 임의의 행을 원자적으로 증감하여,
+    인기 컨텐츠의 좋아요가 한 행의 락에 몰리지 않도록 합니다.
+    실제 좋아요 수는 contents.like_count + SUM(count)이며, 주기적으로 contents.like_count에 합산됩니다.
+    """
+    __tablename__ = "content_like_counters"
+    
+    contents_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    # 아직 contents.like_count에 합산되지 않은 증감 (음수 가능)
+    count = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<ContentLikeCounter(contents_id={self.contents_id}, shard={self.shard}, count={self.count})>"
@@ -0,0 +1,54 @@
+"""
+UserProvisioning model
+Keycloak 사용자 생성 outbox 테이블
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class ProvisioningStatus(str, enum.Enum):
+    """Keycloak 사용자 생성 상태"""
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class UserProvisioning(Base):
+    """
+    Keycloak 사용자 생성 outbox 모델
+    
+    회원가입 시 users 행과 같은 트랜잭션에서 기록되고,
+    백그라운드 워커(keycloak_provisioner)가 Keycloak에 사용자를 생성합니다.
+    """
+    __tablename__ = "user_provisioning_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    # 보상 처리(사용자 삭제 후 Keycloak 사용자 정리)를 위해 FK 없이 보관
+    user_id = Column(Integer, nullable=False, index=True)
+    email = Column(String(255), nullable=False)
+    first_name = Column(String(255), nullable=True)
+    last_name = Column(String(255), nullable=True)
+    # Fernet으로 암호화한 비밀번호 (처리 완료/실패 시 삭제)
+    encrypted_password = Column(Text, nullable=True)
+    status = Column(
+        Enum(ProvisioningStatus),
+        default=ProvisioningStatus.PENDING,
+        nullable=False
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    # 다음 처리 시각 (UTC, 처리 중에는 lease 만료 시각)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    keycloak_user_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # 대기 항목 선점 조회 (status = pending AND next_attempt_at <= now ORDER BY next_attempt_at)
+        Index("ix_user_provisioning_outbox_status_next", "status", "next_attempt_at"),
+    )
+    
+    def __repr__(self):
+        return f"<UserProvisioning(id={self.id}, user_id={self.user_id}, status={self.status})>"
@@ -2,7 +2,7 @@
 WatchHistory model
 시청기록 테이블
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,7 +13,7 @@ class WatchHistory(Base):
     __tablename__ = "watch_history"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     content_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), nullable=False, index=True)
     last_played_time = Column(Float, default=0.0, nullable=False)  # 초 단위
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -22,5 +22,12 @@ class WatchHistory(Base):
     user = relationship("User", back_populates="watch_histories")
     content = relationship("Content", back_populates="watch_histories")
     
+    __table_args__ = (
+        # 사용자당 컨텐츠별 시청기록은 하나 (user_id 단독 조회도 이 인덱스 사용)
+        Index("uq_watch_history_user_content", "user_id", "content_id", unique=True),
+        # 최근 시청 순 목록 조회용 covering 인덱스 (테이블 행을 읽지 않음)
+        Index("ix_watch_history_user_updated", "user_id", "updated_at", "id", "content_id", "last_played_time"),
+    )
+    
     def __repr__(self):
         return f"<WatchHistory(id={self.id}, user_id={self.user_id}, content_id={self.content_id}, last_played_time={self.last_played_time})>"
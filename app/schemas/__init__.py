@@ -2,7 +2,7 @@
 Pydantic schemas
 """
 from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, UserLogin
-from app.schemas.auth import TokenResponse, RegisterResponse
+from app.schemas.auth import TokenResponse, RefreshTokenRequest, RegisterResponse
 
 __all__ = [
     "UserBase",
@@ -11,5 +11,6 @@ __all__ = [
     "UserResponse",
     "UserLogin",
     "TokenResponse",
+    "RefreshTokenRequest",
     "RegisterResponse",
 ]
@@ -1,6 +1,7 @@
 """
 Authentication schemas
 """
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -9,6 +10,13 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
+    refresh_expires_in: Optional[int] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    """토큰 갱신 요청 스키마"""
+    refresh_token: str
 
 
 class RegisterResponse(BaseModel):
@@ -2,8 +2,10 @@
 Content schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.video_asset import VideoAssetResponse
+from app.schemas.watch_history import WatchHistoryResponse
 
 
 class ContentBase(BaseModel):
@@ -34,3 +36,10 @@ class ContentResponse(ContentBase):
     
     class Config:
         from_attributes = True
+
+
+class ContentDetailResponse(ContentResponse):
+    """컨텐츠 상세 화면 응답 스키마 (영상 파일, 내 시청 위치, 좋아요 여부 포함)"""
+    video_assets: List[VideoAssetResponse]
+    progress: Optional[WatchHistoryResponse] = None  # 시청기록이 없으면 null
+    liked: bool
@@ -3,6 +3,8 @@ ContentLike schemas
 """
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
+from app.schemas.content import ContentResponse
 
 
 class ContentLikeResponse(BaseModel):
@@ -14,3 +16,13 @@ class ContentLikeResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class LikedContentsResponse(BaseModel):
+    """좋아요 여부 일괄 조회 응답 스키마"""
+    liked_ids: List[int]  # 요청한 컨텐츠 중 좋아요한 컨텐츠 ID
+
+
+class MyLikeResponse(ContentLikeResponse):
+    """내 좋아요 목록 항목 스키마"""
+    content: Optional[ContentResponse] = None  # include_content=true인 경우 컨텐츠 정보
@@ -2,9 +2,144 @@
 Keycloak integration service
 인증은 Keycloak에서 처리하며, 이 서비스는 Keycloak과의 연동만 담당합니다.
 """
-from typing import Optional, Dict, Any, List
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TypeVar
 import httpx
 from app.core.config import settings
+from app.core.http_client import get_http_client
+
+T = TypeVar("T")
+
+# 관리자 토큰 선제 갱신 최소 간격 (수명이 짧은 토큰에서 Keycloak에 갱신 요청이 몰리지 않도록)
+_MIN_ADMIN_REFRESH_DELAY_SECONDS = 5.0
+
+
+class AdminTokenManager:
+    """
+    Keycloak 관리자 토큰 수명 관리
+    
+    - 발급 시 expires_in을 기록하고, 만료 전에 백그라운드에서 미리 갱신합니다.
+    - 갱신은 single-flight로 직렬화되어 동시에 여러 번 발급되지 않습니다.
+    - refresh_token이 유효하면 password grant 대신 refresh_token grant를 사용합니다.
+    - 토큰 수명이 refresh_margin보다 짧으면 수명의 절반을 여유 시간으로 사용합니다.
+    """
+    
+    def __init__(self, service: "AuthService", refresh_margin: float, retry_interval: float):
+        self._service = service
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._access_token: Optional[str] = None
+        self._expires_at: float = 0.0
+        # 현재 토큰에 적용하는 여유 시간 (토큰 수명의 절반을 넘지 않음)
+        self._margin: float = refresh_margin
+        self._refresh_token: Optional[str] = None
+        self._refresh_expires_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def _is_fresh(self) -> bool:
+        """만료 여유 시간(refresh_margin) 이전인지 여부"""
+        return bool(self._access_token) and time.monotonic() < self._expires_at - self._margin
+    
+    def _is_unexpired(self) -> bool:
+        return bool(self._access_token) and time.monotonic() < self._expires_at
+    
+    def _background_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    async def get_token(self) -> Optional[str]:
+        """
+        유효한 관리자 토큰 반환
+        
+        Returns:
+            관리자 액세스 토큰 (발급 실패 시 None)
+        """
+        if self._is_fresh():
+            return self._access_token
+        # 백그라운드 갱신이 진행 중이면 아직 만료되지 않은 토큰을 그대로 사용
+        if self._is_unexpired() and self._background_running():
+            return self._access_token
+        return await self.refresh()
+    
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """토큰 무효화 (401 응답 시). token이 주어지면 현재 토큰과 같을 때만 무효화"""
+        if token is None or token == self._access_token:
+            self._access_token = None
+            self._expires_at = 0.0
+    
+    async def refresh(self) -> Optional[str]:
+        """토큰 재발급 (동시 호출은 하나의 요청으로 합쳐짐)"""
+        return await self._service._single_flight("admin_token", self._fetch)
+    
+    async def _fetch(self) -> Optional[str]:
+        token_data = None
+        if self._refresh_token and time.monotonic() < self._refresh_expires_at - self.refresh_margin:
+            token_data = await self._grant({
+                "grant_type": "refresh_token",
+                "client_id": "admin-cli",
+                "refresh_token": self._refresh_token,
+            })
+        if token_data is None:
+            token_data = await self._grant({
+                "grant_type": "password",
+                "client_id": "admin-cli",
+                "username": self._service.admin_username,
+                "password": self._service.admin_password,
+            })
+        if token_data is None:
+            return None
+        
+        now = time.monotonic()
+        expires_in = float(token_data.get("expires_in", 60))
+        self._access_token = token_data.get("access_token")
+        self._expires_at = now + expires_in
+        self._margin = min(self.refresh_margin, expires_in * 0.5)
+        self._refresh_token = token_data.get("refresh_token")
+        self._refresh_expires_at = now + float(token_data.get("refresh_expires_in", 0))
+        return self._access_token
+    
+    async def _grant(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """master realm 토큰 엔드포인트 호출"""
+        try:
+            client = get_http_client()
+            response = await client.post(
+                f"{self._service.keycloak_url}/realms/master/protocol/openid-connect/token",
+                data=data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Failed to get admin token ({data['grant_type']}): {str(e)}")
+            return None
+    
+    async def _refresh_loop(self) -> None:
+        while True:
+            if self._access_token:
+                delay = max(self._expires_at - self._margin - time.monotonic(), _MIN_ADMIN_REFRESH_DELAY_SECONDS)
+            else:
+                delay = 0.0
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if await self.refresh() is None:
+                await asyncio.sleep(self.retry_interval)
+    
+    def start(self) -> None:
+        """만료 전 선제 갱신 태스크 시작 (관리자 계정이 설정된 경우만)"""
+        if not self._service.admin_configured() or self._background_running():
+            return
+        self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """선제 갱신 태스크 종료"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
 
 
 class AuthService:
@@ -22,7 +157,40 @@ class AuthService:
         self.client_secret = settings.KEYCLOAK_CLIENT_SECRET
         self.admin_username = settings.KEYCLOAK_ADMIN_USERNAME
         self.admin_password = settings.KEYCLOAK_ADMIN_PASSWORD
-        self._admin_token: Optional[str] = None
+        self.admin_tokens = AdminTokenManager(
+            self,
+            refresh_margin=settings.KEYCLOAK_ADMIN_TOKEN_REFRESH_MARGIN_SECONDS,
+            retry_interval=settings.KEYCLOAK_ADMIN_TOKEN_RETRY_SECONDS
+        )
+        # 진행 중인 fetch (single-flight): 같은 리소스에 대한 동시 요청은 하나의 fetch를 공유
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        같은 key에 대한 동시 호출을 하나의 진행 중인 fetch로 합칩니다.
+        
+        Args:
+            key: 리소스 식별자 (예: "jwks", "admin_token")
+            fetch: 실제 요청을 수행하는 코루틴 함수
+        
+        Returns:
+            fetch 결과 (대기 중인 모든 호출이 같은 결과/예외를 받음)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                # 대기자가 모두 취소된 경우에도 예외가 방치되지 않도록 조회
+                if not t.cancelled():
+                    t.exception()
+            
+            task.add_done_callback(_done)
+        # 한 호출자가 취소되어도 다른 대기자의 fetch는 계속 진행
+        return await asyncio.shield(task)
     
     def get_public_key_url(self) -> Optional[str]:
         """
@@ -37,6 +205,80 @@ class AuthService:
         
         return f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/certs"
     
+    def get_token_url(self) -> Optional[str]:
+        """애플리케이션 realm의 토큰 엔드포인트 URL"""
+        if not all([self.keycloak_url, self.realm]):
+            return None
+        
+        return f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/token"
+    
+    async def _token_grant(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        사용자 토큰 발급 요청 (애플리케이션 클라이언트)
+        
+        Args:
+            data: grant_type별 폼 데이터
+        
+        Returns:
+            토큰 응답 딕셔너리, Keycloak이 자격 증명을 거부하면 None
+        
+        Raises:
+            ValueError: Keycloak 설정이 없는 경우
+            httpx.HTTPError: 네트워크 오류 또는 Keycloak 서버 오류(5xx)
+        """
+        url = self.get_token_url()
+        if not url:
+            raise ValueError("Keycloak URL and Realm must be configured.")
+        
+        form = {"client_id": self.client_id or "backend-client", **data}
+        if self.client_secret:
+            form["client_secret"] = self.client_secret
+        
+        client = get_http_client()
+        response = await client.post(
+            url,
+            data=form,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=10.0
+        )
+        if response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code != 200:
+            return None
+        return response.json()
+    
+    async def password_grant(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """
+        비밀번호로 사용자 토큰 발급 (Resource Owner Password grant)
+        
+        Args:
+            username: 사용자 이메일
+            password: 비밀번호
+        
+        Returns:
+            토큰 응답 딕셔너리 (access_token, refresh_token 등), 거부 시 None
+        """
+        return await self._token_grant({
+            "grant_type": "password",
+            "username": username,
+            "password": password,
+        })
+    
+    async def refresh_grant(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        """
+        refresh_token으로 사용자 토큰 재발급
+        
+        Args:
+            refresh_token: 로그인 시 받은 refresh_token
+        
+        Returns:
+            새 토큰 응답 딕셔너리, 만료/폐기된 refresh_token이면 None
+        """
+        return await self._token_grant({
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        })
+    
     async def _get_admin_token(self) -> Optional[str]:
         """
         Keycloak 관리자 토큰 발급
@@ -45,32 +287,49 @@ class AuthService:
         Returns:
             관리자 액세스 토큰
         """
-        if not all([self.keycloak_url, self.admin_username, self.admin_password]):
+        if not self.admin_configured():
             return None
         
-        if self._admin_token:
-            return self._admin_token
+        return await self.admin_tokens.get_token()
+    
+    def admin_configured(self) -> bool:
+        """Admin API 사용에 필요한 설정 여부"""
+        return all([self.keycloak_url, self.admin_username, self.admin_password])
+    
+    async def admin_request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Keycloak Admin API 요청
+        401 응답 시 토큰을 한 번만 재발급하여 재시도합니다 (재귀 없음).
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.keycloak_url}/realms/master/protocol/openid-connect/token",
-                    data={
-                        "grant_type": "password",
-                        "client_id": "admin-cli",
-                        "username": self.admin_username,
-                        "password": self.admin_password,
-                    },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                token_data = response.json()
-                self._admin_token = token_data.get("access_token")
-                return self._admin_token
-        except Exception as e:
-            print(f"Failed to get admin token: {str(e)}")
-            return None
+        Args:
+            method: HTTP 메서드
+            url: 요청 URL
+            **kwargs: httpx 요청 인자 (json, params 등)
+        
+        Returns:
+            HTTP 응답
+        
+        Raises:
+            ValueError: 관리자 토큰을 발급받을 수 없는 경우
+        """
+        headers = kwargs.pop("headers", {})
+        kwargs.setdefault("timeout", 10.0)
+        client = get_http_client()
+        for attempt in range(2):
+            admin_token = await self._get_admin_token()
+            if not admin_token:
+                raise ValueError("Admin token not available. Please configure KEYCLOAK_ADMIN_USERNAME and KEYCLOAK_ADMIN_PASSWORD.")
+            response = await client.request(
+                method,
+                url,
+                headers={**headers, "Authorization": f"Bearer {admin_token}"},
+                **kwargs
+            )
+            if response.status_code == 401 and attempt == 0:
+                # 토큰 만료/폐기 시 한 번만 재발급
+                self.admin_tokens.invalidate(admin_token)
+                continue
+            return response
     
     async def list_users(
         self,
@@ -86,12 +345,11 @@ class AuthService:
             first: 시작 인덱스
             max_results: 최대 결과 수
             search: 검색어 (사용자명, 이메일 등)
-            
+        
         Returns:
             사용자 목록
         """
-        admin_token = await self._get_admin_token()
-        if not admin_token:
+        if not self.admin_configured():
             raise ValueError("Admin token not available. Please configure KEYCLOAK_ADMIN_USERNAME and KEYCLOAK_ADMIN_PASSWORD.")
         
         if not all([self.keycloak_url, self.realm]):
@@ -107,24 +365,18 @@ class AuthService:
             params["search"] = search
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "Authorization": f"Bearer {admin_token}",
-                        "Content-Type": "application/json"
-                    },
-                    params=params,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self.admin_request(
+                "GET",
+                url,
+                headers={"Content-Type": "application/json"},
+                params=params
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                # 토큰 만료 시 재발급
-                self._admin_token = None
-                return await self.list_users(first, max_results, search)
             raise ValueError(f"Failed to list users: {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Failed to list users: {str(e)}")
     
@@ -135,12 +387,11 @@ class AuthService:
         
         Args:
             user_id: Keycloak 사용자 ID
-            
+        
         Returns:
             사용자 정보 딕셔너리
         """
-        admin_token = await self._get_admin_token()
-        if not admin_token:
+        if not self.admin_configured():
             raise ValueError("Admin token not available. Please configure KEYCLOAK_ADMIN_USERNAME and KEYCLOAK_ADMIN_PASSWORD.")
         
         if not all([self.keycloak_url, self.realm]):
@@ -149,25 +400,19 @@ class AuthService:
         url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}"
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "Authorization": f"Bearer {admin_token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self.admin_request(
+                "GET",
+                url,
+                headers={"Content-Type": "application/json"}
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                # 토큰 만료 시 재발급
-                self._admin_token = None
-                return await self.get_user_by_id(user_id)
-            elif e.response.status_code == 404:
+            if e.response.status_code == 404:
                 return None
             raise ValueError(f"Failed to get user: {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Failed to get user: {str(e)}")
     
@@ -178,7 +423,7 @@ class AuthService:
         
         Args:
             access_token: Keycloak 액세스 토큰
-            
+        
         Returns:
             사용자 정보 딕셔너리
         """
@@ -188,84 +433,96 @@ class AuthService:
         url = f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/userinfo"
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
+            client = get_http_client()
+            response = await client.get(
+                url,
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "Content-Type": "application/json"
+                },
+                timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             print(f"Failed to get user info: {str(e)}")
             return None
     
-    async def get_public_key(self, kid: Optional[str] = None) -> Optional[str]:
+    @staticmethod
+    def _jwk_to_public_key(key: Dict[str, Any]) -> Any:
         """
-        Keycloak에서 JWT 검증용 공개 키를 가져옵니다.
+        JWK(RSA)를 cryptography 공개 키 객체로 변환합니다.
         
         Args:
-            kid: Key ID (JWT 헤더에서 추출). None이면 서명용 키 중 첫 번째 사용
+            key: JWKS의 개별 키 (n, e 포함)
         
         Returns:
-            PEM 형식의 공개 키
+            RSAPublicKey 객체
         """
-        if not all([self.keycloak_url, self.realm]):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        import base64
+        
+        n_bytes = base64.urlsafe_b64decode(key['n'] + '==')
+        e_bytes = base64.urlsafe_b64decode(key['e'] + '==')
+        
+        n = int.from_bytes(n_bytes, 'big')
+        e = int.from_bytes(e_bytes, 'big')
+        
+        return rsa.RSAPublicNumbers(e, n).public_key()
+    
+    async def _fetch_certs(self) -> Optional[Dict[str, Any]]:
+        """
+        Keycloak certs 엔드포인트에서 JWKS 원본을 가져옵니다.
+        
+        Returns:
+            JWKS 딕셔너리 ({"keys": [...]})
+        """
+        url = self.get_public_key_url()
+        if not url:
             return None
         
         try:
-            url = f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/certs"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                certs = response.json()
-                
-                # kid가 제공된 경우 해당 키를 찾고, 없으면 서명용 키 중 첫 번째 사용
-                key = None
-                if kid:
-                    for k in certs['keys']:
-                        if k.get('kid') == kid and k.get('use') == 'sig':
-                            key = k
-                            break
-                
-                # kid가 없거나 찾지 못한 경우 서명용 키 중 첫 번째 사용
-                if not key:
-                    for k in certs['keys']:
-                        if k.get('use') == 'sig':
-                            key = k
-                            break
-                
-                # 여전히 키를 찾지 못한 경우 첫 번째 키 사용 (하위 호환성)
-                if not key:
-                    key = certs['keys'][0]
-                
-                # JWK to PEM 변환
-                from cryptography.hazmat.primitives import serialization
-                from cryptography.hazmat.primitives.asymmetric import rsa
-                import base64
-                
-                n_bytes = base64.urlsafe_b64decode(key['n'] + '==')
-                e_bytes = base64.urlsafe_b64decode(key['e'] + '==')
-                
-                n = int.from_bytes(n_bytes, 'big')
-                e = int.from_bytes(e_bytes, 'big')
-                
-                pub_key = rsa.RSAPublicNumbers(e, n).public_key()
-                pem = pub_key.public_bytes(
-                    encoding=serialization.Encoding.PEM,
-                    format=serialization.PublicFormat.SubjectPublicKeyInfo
-                ).decode()
-                return pem
+            client = get_http_client()
+            response = await client.get(
+                url,
+                timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Failed to get public key from Keycloak: {e.response.text}")
         except Exception as e:
             raise ValueError(f"Error getting public key: {str(e)}")
+    
+    async def get_jwks(self) -> Dict[str, Any]:
+        """
+        Keycloak JWKS의 서명용 키 전체를 kid 기준으로 가져옵니다.
+        동시 호출은 하나의 certs 요청으로 합쳐집니다.
+        
+        Returns:
+            {kid: RSAPublicKey} 딕셔너리 (서명용 키가 앞쪽에 위치)
+            요청마다 PEM을 다시 파싱하지 않도록 파싱된 키 객체를 반환합니다.
+        """
+        return await self._single_flight("jwks", self._fetch_jwks)
+    
+    async def _fetch_jwks(self) -> Dict[str, Any]:
+        """certs 요청 후 서명용 키를 kid 기준으로 변환"""
+        certs = await self._fetch_certs()
+        if not certs:
+            return {}
+        
+        keys: Dict[str, Any] = {}
+        try:
+            # 서명용 키(use: sig)를 먼저 등록하여 kid 없는 토큰의 기본 키가 되도록 함
+            for k in sorted(certs.get('keys', []), key=lambda k: k.get('use') != 'sig'):
+                if k.get('kty') != 'RSA' or not k.get('kid'):
+                    continue
+                if k.get('use') not in (None, 'sig'):
+                    continue
+                keys[k['kid']] = self._jwk_to_public_key(k)
+        except Exception as e:
+            raise ValueError(f"Error getting public key: {str(e)}")
+        return keys
 
 
 # 전역 인증 서비스 인스턴스
@@ -0,0 +1,446 @@
+"""
+Keycloak user provisioning worker
+회원가입 outbox(user_provisioning_outbox)를 읽어 Keycloak에 사용자를 생성합니다.
+
+- 회원가입은 DB 커밋까지만 기다리고, Keycloak 호출은 이 워커가 비동기로 처리합니다.
+- 여러 uvicorn 워커가 동시에 실행되어도 항목은 lease(낙관적 갱신)로 한 곳에서만 처리됩니다.
+- 일시적 오류는 지수 백오프로 재시도합니다.
+- 409(이미 존재)는 기존 Keycloak 사용자를 조회해 이 회원가입의 이전 시도가 만든 계정인 경우에만 성공으로 처리합니다.
+- 비밀번호는 OUTBOX_ENCRYPTION_KEY(필수)로 암호화해 처리 완료 전까지만 보관합니다.
+- Keycloak 생성 후 DB 사용자가 사라진 경우 생성한 Keycloak 사용자를 삭제합니다(보상).
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.models.user_provisioning import UserProvisioning, ProvisioningStatus
+from app.services.auth import auth_service
+
+logger = logging.getLogger(__name__)
+
+# 재시도해도 결과가 바뀌지 않는 Keycloak 응답 (요청 자체가 잘못됨)
+_PERMANENT_STATUS_CODES = {400, 403, 404, 422}
+# 생성한 Keycloak 사용자에 기록하는 DB 사용자 ID 속성 (409 시 이 회원가입의 계정인지 확인)
+_USER_ID_ATTRIBUTE = "app_user_id"
+# 속성이 없는 기존 계정을 이전 시도가 만든 것으로 볼 때 허용하는 시각 차이 (DB/Keycloak 시계 차이)
+_CREATED_SKEW_SECONDS = 60
+# 이전 시도가 만든 Keycloak 사용자를 찾아 완료 처리한 항목의 기록
+_EXISTING_USER_NOTE = "Keycloak user already created by an earlier attempt"
+
+
+class PermanentProvisioningError(Exception):
+    """재시도하지 않는 사용자 생성 실패"""
+
+
+def _get_fernet() -> MultiFernet:
+    """
+    outbox 비밀번호 암호화 키 (OUTBOX_ENCRYPTION_KEY)
+    
+    쉼표로 여러 키를 지정하면 첫 번째 키로 암호화하고 모든 키로 복호화합니다 (키 교체 시 이전 키를 뒤에 유지).
+    
+    Raises:
+        RuntimeError: OUTBOX_ENCRYPTION_KEY가 설정되지 않은 경우
+    """
+    keys = [key.strip() for key in (settings.OUTBOX_ENCRYPTION_KEY or "").split(",") if key.strip()]
+    if not keys:
+        raise RuntimeError("OUTBOX_ENCRYPTION_KEY is required when Keycloak user provisioning is enabled")
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def _as_utc_timestamp(value: datetime) -> float:
+    """DB 시각(UTC, timezone 없음)을 epoch 초로 변환"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class KeycloakProvisioner:
+    """outbox 기반 Keycloak 사용자 생성 워커"""
+    
+    def __init__(
+        self,
+        batch_size: int,
+        concurrency: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def enabled(self) -> bool:
+        """Keycloak Admin API가 설정된 경우에만 outbox 사용 (이때 OUTBOX_ENCRYPTION_KEY 필수)"""
+        return auth_service.admin_configured()
+    
+    def enqueue(self, db: AsyncSession, user: User, password: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> None:
+        """
+        outbox 항목 추가 (호출자의 트랜잭션에 포함되며, 커밋은 호출자가 수행)
+        
+        Args:
+            db: 사용자 생성과 같은 데이터베이스 세션
+            user: flush되어 id가 있는 사용자
+            password: 평문 비밀번호 (암호화하여 저장)
+            first_name: 이름
+            last_name: 성
+        """
+        db.add(UserProvisioning(**self.outbox_values(user.id, user.email, password, first_name, last_name)))
+    
+    @staticmethod
+    def outbox_values(
+        user_id: int,
+        email: str,
+        password: str,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """outbox 행 값 (대량 등록 시 multi-row insert에 사용)"""
+        return {
+            "user_id": user_id,
+            "email": email,
+            "first_name": first_name,
+            "last_name": last_name,
+            "encrypted_password": _get_fernet().encrypt(password.encode()).decode(),
+            "status": ProvisioningStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": datetime.utcnow(),
+        }
+    
+    def notify(self) -> None:
+        """새 항목이 커밋되었음을 알려 다음 주기를 기다리지 않고 처리"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _claim_batch(self, user_ids: Optional[List[int]] = None) -> List[UserProvisioning]:
+        """처리할 항목을 lease로 선점 (다른 워커와 중복 처리 방지)"""
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            query = select(UserProvisioning.id, UserProvisioning.next_attempt_at).where(
+                UserProvisioning.status == ProvisioningStatus.PENDING,
+                UserProvisioning.next_attempt_at <= now
+            )
+            if user_ids is not None:
+                query = query.where(UserProvisioning.user_id.in_(user_ids))
+            rows = (await db.execute(
+                query.order_by(UserProvisioning.next_attempt_at).limit(
+                    self.batch_size if user_ids is None else len(user_ids)
+                )
+            )).all()
+            if not rows:
+                return []
+            
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            claimed = []
+            for row in rows:
+                # 조회 이후 다른 워커가 선점했다면 next_attempt_at이 바뀌어 0행 갱신
+                result = await db.execute(
+                    update(UserProvisioning).where(
+                        UserProvisioning.id == row.id,
+                        UserProvisioning.status == ProvisioningStatus.PENDING,
+                        UserProvisioning.next_attempt_at == row.next_attempt_at
+                    ).values(next_attempt_at=lease_until)
+                )
+                if result.rowcount:
+                    claimed.append(row.id)
+            await db.commit()
+            if not claimed:
+                return []
+            
+            result = await db.execute(select(UserProvisioning).where(UserProvisioning.id.in_(claimed)))
+            entries = result.scalars().all()
+            db.expunge_all()
+            return list(entries)
+    
+    async def _create_keycloak_user(self, entry: UserProvisioning) -> Tuple[Optional[str], bool]:
+        """
+        Keycloak에 사용자 생성
+        
+        Returns:
+            (Keycloak 사용자 ID, 이전 시도가 이미 만든 사용자인지 여부)
+        
+        Raises:
+            PermanentProvisioningError: 재시도해도 성공할 수 없는 경우
+        """
+        if entry.keycloak_user_id:
+            # 이전 시도에서 생성 후 보상 처리가 실패한 항목
+            return entry.keycloak_user_id, False
+        
+        try:
+            password = _get_fernet().decrypt(entry.encrypted_password.encode()).decode()
+        except (InvalidToken, AttributeError) as e:
+            raise PermanentProvisioningError(
+                f"Cannot decrypt password ({type(e).__name__}); "
+                "it was encrypted with a key that is no longer in OUTBOX_ENCRYPTION_KEY"
+            )
+        
+        user_payload = {
+            "username": entry.email,
+            "email": entry.email,
+            "enabled": True,
+            "emailVerified": True,  # 회원가입 시 이메일 인증 완료로 설정
+            "attributes": {_USER_ID_ATTRIBUTE: [str(entry.user_id)]},
+            "credentials": [{
+                "type": "password",
+                "value": password,
+                "temporary": False
+            }]
+        }
+        
+        # firstName과 lastName 추가 (Keycloak에서 필요)
+        if entry.first_name:
+            user_payload["firstName"] = entry.first_name
+        if entry.last_name:
+            user_payload["lastName"] = entry.last_name
+        
+        url = f"{auth_service.keycloak_url}/admin/realms/{auth_service.realm}/users"
+        response = await auth_service.admin_request(
+            "POST",
+            url,
+            headers={"Content-Type": "application/json"},
+            json=user_payload
+        )
+        if response.status_code == 409:
+            # 이전 시도에서 이미 생성된 경우만 성공 (다른 비밀번호의 기존 계정은 실패)
+            return await self._find_own_keycloak_user(entry), True
+        if response.status_code in _PERMANENT_STATUS_CODES:
+            raise PermanentProvisioningError(f"Keycloak rejected user ({response.status_code}): {response.text[:200]}")
+        response.raise_for_status()
+        # Keycloak은 Location 헤더에 사용자 ID를 반환
+        location = response.headers.get("Location", "")
+        return (location.split("/")[-1] if location else None), False
+    
+    async def _find_own_keycloak_user(self, entry: UserProvisioning) -> str:
+        """
+        409 응답 시 같은 이메일의 Keycloak 사용자가 이 회원가입의 이전 시도가 만든 계정인지 확인
+        
+        - app_user_id 속성이 outbox의 user_id와 같으면 같은 계정
+        - 속성이 없으면(사용자 프로필 설정에 따라 저장되지 않을 수 있음) 이름이 같고
+          outbox 항목 생성 이후에 만들어진 계정만 같은 계정으로 봄
+        
+        Returns:
+            Keycloak 사용자 ID
+        
+        Raises:
+            PermanentProvisioningError: 다른 기존 계정이거나 찾을 수 없는 경우
+        """
+        url = f"{auth_service.keycloak_url}/admin/realms/{auth_service.realm}/users"
+        response = await auth_service.admin_request(
+            "GET",
+            url,
+            params={"username": entry.email, "exact": "true", "briefRepresentation": "false"}
+        )
+        response.raise_for_status()
+        candidates = response.json()
+        if not candidates:
+            response = await auth_service.admin_request(
+                "GET",
+                url,
+                params={"email": entry.email, "exact": "true", "briefRepresentation": "false"}
+            )
+            response.raise_for_status()
+            candidates = response.json()
+        if not candidates:
+            raise PermanentProvisioningError("Keycloak reported a conflict (409) but no user with this email was found")
+        
+        user = candidates[0]
+        owner = (user.get("attributes") or {}).get(_USER_ID_ATTRIBUTE)
+        if owner is not None:
+            if owner == [str(entry.user_id)]:
+                return user["id"]
+        elif (
+            (user.get("firstName") or None) == (entry.first_name or None)
+            and (user.get("lastName") or None) == (entry.last_name or None)
+            and user.get("createdTimestamp", 0) / 1000 >= _as_utc_timestamp(entry.created_at) - _CREATED_SKEW_SECONDS
+        ):
+            return user["id"]
+        raise PermanentProvisioningError(
+            "A different Keycloak account already exists for this email; not linking it to this registration"
+        )
+    
+    async def _delete_keycloak_user(self, keycloak_user_id: str) -> None:
+        """Keycloak에서 사용자 삭제 (보상 처리)"""
+        url = f"{auth_service.keycloak_url}/admin/realms/{auth_service.realm}/users/{keycloak_user_id}"
+        response = await auth_service.admin_request("DELETE", url)
+        if response.status_code != 404:
+            response.raise_for_status()
+    
+    async def _process(self, entry: UserProvisioning, semaphore: asyncio.Semaphore) -> Tuple[UserProvisioning, Dict[str, Any]]:
+        """항목 하나 처리 후 outbox에 기록할 변경 사항 반환"""
+        async with semaphore:
+            try:
+                keycloak_user_id, existing = await self._create_keycloak_user(entry)
+                changes = {"status": ProvisioningStatus.DONE, "keycloak_user_id": keycloak_user_id}
+                if existing:
+                    changes["last_error"] = _EXISTING_USER_NOTE
+                return entry, changes
+            except PermanentProvisioningError as e:
+                logger.warning(f"Keycloak 사용자 생성 실패 (재시도 안 함) user_id={entry.user_id}: {e}")
+                return entry, {"status": ProvisioningStatus.FAILED, "last_error": str(e)}
+            except Exception as e:
+                # 네트워크 오류, Keycloak 5xx, 관리자 토큰 발급 실패 등은 재시도
+                return entry, self._retry_changes(entry, f"{type(e).__name__}: {e}")
+    
+    def _retry_changes(self, entry: UserProvisioning, error: str) -> Dict[str, Any]:
+        """재시도 예약 (지수 백오프 + jitter), 최대 횟수 초과 시 failed"""
+        attempts = entry.attempts + 1
+        if attempts >= self.max_attempts:
+            logger.warning(f"Keycloak 사용자 생성 재시도 한도 초과 user_id={entry.user_id}: {error}")
+            return {"status": ProvisioningStatus.FAILED, "attempts": attempts, "last_error": error}
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        delay *= random.uniform(0.8, 1.2)
+        return {
+            "attempts": attempts,
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+        }
+    
+    async def _compensate(self, results: List[Tuple[UserProvisioning, Dict[str, Any]]]) -> None:
+        """Keycloak 생성 후 DB 사용자가 삭제된 경우 Keycloak 사용자 정리"""
+        created = [(entry, changes) for entry, changes in results if changes.get("keycloak_user_id")]
+        if not created:
+            return
+        existing = await self._existing_user_ids([entry.user_id for entry, _ in created])
+        for entry, changes in created:
+            if entry.user_id in existing:
+                continue
+            try:
+                await self._delete_keycloak_user(changes["keycloak_user_id"])
+                changes["last_error"] = "User deleted before provisioning; Keycloak user removed"
+            except Exception as e:
+                # 삭제 실패 시 Keycloak 사용자 ID를 남겨 두고 다음 시도에서 보상만 다시 수행
+                retry = self._retry_changes(entry, f"Compensation failed: {e}")
+                retry["keycloak_user_id"] = changes["keycloak_user_id"]
+                changes.clear()
+                changes.update(retry)
+    
+    @staticmethod
+    async def _existing_user_ids(user_ids: List[int]) -> Set[int]:
+        async with AsyncSessionLocal() as db:
+            result = await db.scalars(select(User.id).where(User.id.in_(user_ids)))
+            return set(result.all())
+    
+    @staticmethod
+    async def _record(results: List[Tuple[UserProvisioning, Dict[str, Any]]]) -> None:
+        """처리 결과 저장 (완료/실패 항목의 비밀번호는 삭제)"""
+        async with AsyncSessionLocal() as db:
+            for entry, changes in results:
+                values = dict(changes)
+                if changes.get("status") in (ProvisioningStatus.DONE, ProvisioningStatus.FAILED):
+                    values["encrypted_password"] = None
+                await db.execute(update(UserProvisioning).where(UserProvisioning.id == entry.id).values(**values))
+            await db.commit()
+    
+    async def _provision(self, entries: List[UserProvisioning]) -> List[Tuple[UserProvisioning, Dict[str, Any]]]:
+        """선점한 항목을 제한된 동시성으로 처리하고 결과 저장"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*[self._process(entry, semaphore) for entry in entries])
+        await self._compensate(results)
+        await self._record(results)
+        return results
+    
+    async def run_once(self) -> int:
+        """
+        대기 중인 항목 한 배치 처리
+        
+        Returns:
+            처리한 항목 수
+        """
+        entries = await self._claim_batch()
+        if not entries:
+            return 0
+        
+        await self._provision(entries)
+        return len(entries)
+    
+    async def provision_users(self, user_ids: List[int]) -> Dict[int, str]:
+        """
+        특정 사용자들의 outbox 항목을 즉시 처리 (대량 등록용)
+        
+        Args:
+            user_ids: 방금 커밋한 사용자 ID 목록
+        
+        Returns:
+            user_id -> 결과 ("created", "exists", "failed", "retrying", "queued")
+            "queued"는 다른 워커가 이미 처리 중인 항목입니다.
+        """
+        outcomes = {user_id: "queued" for user_id in user_ids}
+        if not user_ids:
+            return outcomes
+        
+        entries = await self._claim_batch(user_ids)
+        for entry, changes in await self._provision(entries):
+            if changes.get("status") == ProvisioningStatus.DONE:
+                outcomes[entry.user_id] = "exists" if changes.get("last_error") == _EXISTING_USER_NOTE else "created"
+            elif changes.get("status") == ProvisioningStatus.FAILED:
+                outcomes[entry.user_id] = "failed"
+            else:
+                outcomes[entry.user_id] = "retrying"
+        return outcomes
+    
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.warning(f"Keycloak 사용자 생성 배치 실패: {e}")
+                processed = 0
+            if processed >= self.batch_size:
+                # 밀린 항목이 더 있으면 바로 다음 배치 처리
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+    
+    def start(self) -> None:
+        """
+        워커 시작 (Keycloak Admin API가 설정된 경우만)
+        
+        Raises:
+            RuntimeError: OUTBOX_ENCRYPTION_KEY가 없는 경우 (비밀번호를 암호화할 수 없으므로 기동 실패)
+            ValueError: OUTBOX_ENCRYPTION_KEY가 올바른 Fernet 키가 아닌 경우
+        """
+        if not self.enabled() or (self._task and not self._task.done()):
+            return
+        _get_fernet()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run_loop())
+    
+    async def stop(self) -> None:
+        """워커 종료 (남은 항목은 다음 실행 시 처리)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+
+
+# 전역 outbox 워커
+keycloak_provisioner = KeycloakProvisioner(
+    batch_size=settings.PROVISIONING_BATCH_SIZE,
+    concurrency=settings.PROVISIONING_CONCURRENCY,
+    poll_interval=settings.PROVISIONING_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.PROVISIONING_LEASE_SECONDS,
+    max_attempts=settings.PROVISIONING_MAX_ATTEMPTS,
+    backoff_base=settings.PROVISIONING_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.PROVISIONING_BACKOFF_MAX_SECONDS
+)
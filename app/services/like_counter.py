@@ -0,0 +1,221 @@
+"""
+Content like counter service
+좋아요 수 분산 카운터 (content_like_counters)
+
+- 좋아요/취소는 컨텐츠별 LIKE_COUNTER_SHARDS개 행 중 임의의 행을 upsert로 원자적으로 증감합니다.
+  (contents 행을 읽고-수정-쓰기 하지 않으므로 동시 요청에도 유실이 없고, 인기 컨텐츠도 행 락 하나에 몰리지 않음)
+- 실제 좋아요 수 = contents.like_count + SUM(shard.count). 컨텐츠 조회 시 합산해서 반환합니다.
+- 백그라운드 롤업이 LIKE_COUNTER_ROLLUP_INTERVAL_SECONDS마다 shard 값을 contents.like_count로 옮깁니다.
+  (더한 만큼 같은 트랜잭션에서 빼므로 여러 워커가 동시에 실행해도 합계는 변하지 않음)
+- reconcile은 contents_likes에서 좋아요 수를 다시 세어 어긋난 값을 바로잡습니다 (scripts/reconcile_like_counts.py).
+"""
+import asyncio
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.content import Content
+from app.models.content_like import ContentLike
+from app.models.content_like_counter import ContentLikeCounter
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCounter:
+    """컨텐츠 좋아요 수 분산 카운터"""
+    
+    def __init__(self, shards: int, rollup_interval: float, batch_size: int):
+        self.shards = max(1, shards)
+        self.rollup_interval = rollup_interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+    
+    async def increment(self, db: AsyncSession, content_id: int, delta: int) -> None:
+        """
+        좋아요 수 증감 (호출자의 트랜잭션에 포함되며, 커밋은 호출자가 수행)
+        
+        Args:
+            db: 좋아요 추가/삭제와 같은 데이터베이스 세션
+            content_id: 컨텐츠 ID
+            delta: 증감 값 (+1 / -1)
+        """
+        dialect = db.get_bind().dialect.name
+        values = {"contents_id": content_id, "shard": random.randrange(self.shards), "count": delta}
+        if dialect == "mysql":
+            stmt = mysql.insert(ContentLikeCounter).values(values)
+            stmt = stmt.on_duplicate_key_update(count=ContentLikeCounter.count + stmt.inserted.count)
+        else:
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(ContentLikeCounter).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ContentLikeCounter.contents_id, ContentLikeCounter.shard],
+                set_={"count": ContentLikeCounter.count + stmt.excluded.count}
+            )
+        await db.execute(stmt)
+    
+    @staticmethod
+    async def pending_counts(db: AsyncSession, content_ids: Iterable[int]) -> Dict[int, int]:
+        """아직 contents.like_count에 합산되지 않은 컨텐츠별 증감 (쿼리 한 번)"""
+        content_ids = list(content_ids)
+        if not content_ids:
+            return {}
+        result = await db.execute(
+            select(ContentLikeCounter.contents_id, func.sum(ContentLikeCounter.count))
+            .where(ContentLikeCounter.contents_id.in_(content_ids))
+            .group_by(ContentLikeCounter.contents_id)
+        )
+        return {content_id: int(total or 0) for content_id, total in result.all()}
+    
+    @staticmethod
+    def pending_column():
+        """컨텐츠별 합산되지 않은 증감 (Content와 함께 select 하는 상관 서브쿼리, 쿼리 한 번으로 조회할 때 사용)"""
+        return func.coalesce(
+            select(func.sum(ContentLikeCounter.count))
+            .where(ContentLikeCounter.contents_id == Content.id)
+            .scalar_subquery(),
+            0
+        )
+    
+    @staticmethod
+    def add_pending(content: Content, pending: int) -> Content:
+        """like_count에 합산되지 않은 증감을 반영 (세션 변경으로 기록되지 않음)"""
+        if pending:
+            set_committed_value(content, "like_count", max(0, content.like_count + int(pending)))
+        return content
+    
+    async def apply_pending(self, db: AsyncSession, contents: List[Content]) -> List[Content]:
+        """
+        조회한 컨텐츠의 like_count에 합산되지 않은 증감을 반영
+        
+        Returns:
+            같은 컨텐츠 목록
+        """
+        pending = await self.pending_counts(db, [content.id for content in contents])
+        for content in contents:
+            self.add_pending(content, pending.get(content.id, 0))
+        return contents
+    
+    async def rollup(self) -> int:
+        """
+        shard 값을 contents.like_count로 옮김 (컨텐츠별 짧은 트랜잭션)
+        
+        contents 행을 먼저 갱신하여, 좋아요 트랜잭션(contents FK 공유 락 -> shard 행)과 락 순서를 맞춥니다.
+        
+        Returns:
+            옮긴 shard 행 수 (batch_size와 같으면 남은 행이 더 있을 수 있음)
+        """
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(ContentLikeCounter.contents_id, ContentLikeCounter.shard, ContentLikeCounter.count)
+                .where(ContentLikeCounter.count != 0)
+                .order_by(ContentLikeCounter.contents_id)
+                .limit(self.batch_size)
+            )).all()
+            shards_by_content: Dict[int, List[Tuple[int, int]]] = {}
+            for content_id, shard, count in rows:
+                shards_by_content.setdefault(content_id, []).append((shard, count))
+            
+            for content_id, shards in shards_by_content.items():
+                await db.execute(
+                    update(Content).where(Content.id == content_id)
+                    .values(like_count=Content.like_count + sum(count for _, count in shards))
+                )
+                for shard, count in shards:
+                    # 읽은 뒤 들어온 증감은 남도록 읽은 값만큼만 뺌
+                    await db.execute(
+                        update(ContentLikeCounter).where(
+                            ContentLikeCounter.contents_id == content_id,
+                            ContentLikeCounter.shard == shard
+                        ).values(count=ContentLikeCounter.count - count)
+                    )
+                await db.commit()
+            return len(rows)
+    
+    async def reconcile(self, batch_size: int = 200) -> Tuple[int, int]:
+        """
+        contents_likes에서 좋아요 수를 다시 세어 contents.like_count를 바로잡고 shard 행을 비움
+        
+        컨텐츠 id 순으로 batch_size개씩 처리하며, 배치마다 contents 행을 잠가(FOR UPDATE)
+        그 사이의 좋아요가 집계에서 빠지지 않도록 합니다.
+        
+        Returns:
+            (확인한 컨텐츠 수, 값이 달랐던 컨텐츠 수)
+        """
+        checked = fixed = 0
+        last_id = 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                content_rows = (await db.execute(
+                    select(Content.id, Content.like_count)
+                    .where(Content.id > last_id)
+                    .order_by(Content.id)
+                    .limit(batch_size)
+                    .with_for_update()
+                )).all()
+                if not content_rows:
+                    break
+                content_ids = [row.id for row in content_rows]
+                last_id = content_ids[-1]
+                
+                # 커밋되지 않은 좋아요 취소가 끝날 때까지 기다리도록 공유 락으로 집계
+                actual = dict((await db.execute(
+                    select(ContentLike.contents_id, func.count())
+                    .where(ContentLike.contents_id.in_(content_ids))
+                    .group_by(ContentLike.contents_id)
+                    .with_for_update(read=True)
+                )).all())
+                pending = await self.pending_counts(db, content_ids)
+                for row in content_rows:
+                    count = actual.get(row.id, 0)
+                    if row.like_count + pending.get(row.id, 0) != count:
+                        fixed += 1
+                        logger.warning(
+                            f"좋아요 수 보정: content_id={row.id}, "
+                            f"{row.like_count + pending.get(row.id, 0)} -> {count}"
+                        )
+                    if row.like_count != count:
+                        await db.execute(update(Content).where(Content.id == row.id).values(like_count=count))
+                if pending:
+                    await db.execute(delete(ContentLikeCounter).where(ContentLikeCounter.contents_id.in_(content_ids)))
+                await db.commit()
+                checked += len(content_rows)
+        return checked, fixed
+    
+    async def _run_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.rollup_interval)
+            try:
+                # 밀린 shard가 batch_size보다 많으면 이어서 처리
+                while await self.rollup() >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.warning(f"좋아요 수 롤업 실패: {e}")
+    
+    def start(self) -> None:
+        """주기적 롤업 시작"""
+        if self.rollup_interval <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run_loop())
+    
+    async def stop(self) -> None:
+        """주기적 롤업 종료 (남은 shard 값은 조회 시 합산되고 다음 실행 시 롤업됨)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 전역 좋아요 카운터
+like_counter = LikeCounter(
+    shards=settings.LIKE_COUNTER_SHARDS,
+    rollup_interval=settings.LIKE_COUNTER_ROLLUP_INTERVAL_SECONDS,
+    batch_size=settings.LIKE_COUNTER_ROLLUP_BATCH_SIZE
+)
@@ -0,0 +1,74 @@
+"""
+Liked contents lookup
+여러 컨텐츠에 대한 사용자의 좋아요 여부를 한 번에 조회 (카탈로그 그리드의 하트 표시)
+
+- 캐시에 없는 컨텐츠 id만 (user_id, contents_id) unique 인덱스의 IN 조회 한 번으로 확인합니다.
+- 사용자별로 확인한 id 집합과 좋아요한 id 집합을 캐시하며, 좋아요/취소 시 무효화합니다.
+- 캐시는 워커 프로세스별이므로 다른 워커의 좋아요/취소는 최대 LIKED_CONTENTS_CACHE_TTL_SECONDS 뒤에 반영됩니다.
+"""
+from typing import FrozenSet, List, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.content_like import ContentLike
+
+# 사용자별로 기억하는 컨텐츠 id 수 상한 (넘으면 이번 조회 결과만 남김)
+_MAX_KNOWN_IDS = 5000
+
+# user_id -> (확인한 컨텐츠 id, 그중 좋아요한 컨텐츠 id)
+liked_contents_cache = TTLCache(
+    maxsize=settings.LIKED_CONTENTS_CACHE_MAX_SIZE,
+    ttl_seconds=settings.LIKED_CONTENTS_CACHE_TTL_SECONDS
+)
+
+_Entry = Tuple[FrozenSet[int], FrozenSet[int]]
+
+
+class LikedContentsService:
+    """사용자 좋아요 여부 일괄 조회"""
+    
+    def __init__(self, cache: TTLCache):
+        self._cache = cache
+        # 조회 중 무효화가 있었는지 확인하는 카운터 (무효화 전 결과를 캐시에 다시 넣지 않도록)
+        self._invalidations = 0
+    
+    async def liked_among(self, db: AsyncSession, user_id: int, content_ids: Sequence[int]) -> List[int]:
+        """
+        content_ids 중 사용자가 좋아요한 컨텐츠 id
+        
+        Args:
+            db: 데이터베이스 세션
+            user_id: 사용자 ID
+            content_ids: 확인할 컨텐츠 ID
+        
+        Returns:
+            좋아요한 컨텐츠 ID (요청 순서)
+        """
+        entry: _Entry = self._cache.get(user_id) or (frozenset(), frozenset())
+        known, liked = entry
+        missing = {content_id for content_id in content_ids if content_id not in known}
+        if missing:
+            invalidations = self._invalidations
+            found = await db.scalars(
+                select(ContentLike.contents_id).where(
+                    ContentLike.user_id == user_id,
+                    ContentLike.contents_id.in_(missing)
+                )
+            )
+            found = frozenset(found)
+            if len(known) + len(missing) > _MAX_KNOWN_IDS:
+                known, liked = frozenset(), frozenset()
+            known, liked = known | missing, liked | found
+            if invalidations == self._invalidations:
+                self._cache.set(user_id, (known, liked))
+        return [content_id for content_id in dict.fromkeys(content_ids) if content_id in liked]
+    
+    def invalidate(self, user_id: int) -> None:
+        """좋아요/취소 후 사용자 캐시 무효화"""
+        self._invalidations += 1
+        self._cache.delete(user_id)
+
+
+# 전역 좋아요 여부 조회 서비스
+liked_contents_service = LikedContentsService(liked_contents_cache)
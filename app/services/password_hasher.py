@@ -0,0 +1,154 @@
+"""
+Password hashing executor
+bcrypt 해싱/검증을 이벤트 루프 밖의 전용 프로세스 풀에서 실행합니다.
+
+bcrypt는 호출당 수십~수백 ms의 CPU를 사용하므로 async 핸들러에서 직접 호출하면
+그동안 같은 워커의 다른 요청이 모두 멈춥니다. 대기 중인 작업 수를 제한(admission control)하여
+로그인 폭주 시에도 큐가 무한히 쌓이지 않도록 합니다.
+
+대량 등록 해싱은 로그인 admission 한도와 별도로 동시 실행 수(bulk_concurrency)만 제한하며,
+한도에 걸리면 거절하지 않고 자리가 날 때까지 기다립니다.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 비밀번호 해싱 컨텍스트
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """bcrypt 전용 프로세스 풀 (대기 작업 수 제한 및 큐 지표 제공)"""
+    
+    def __init__(self, max_workers: int, max_pending: int, bulk_concurrency: int = 0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        # 대량 등록의 동시 해싱 수 (풀의 일부만 사용하여 로그인 작업이 뒤에 오래 밀리지 않도록)
+        self.bulk_concurrency = bulk_concurrency or max(1, self.max_workers // 2)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._bulk_slots = asyncio.Semaphore(self.bulk_concurrency)
+        self._bulk_running = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    def start(self) -> None:
+        """프로세스 풀 생성 (이미 있으면 무시)"""
+        if self._executor is not None:
+            return
+        try:
+            # 스레드가 있는 프로세스에서 fork하지 않도록 forkserver 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+        except Exception as e:
+            # 프로세스 풀을 만들 수 없는 환경에서는 기본 스레드 풀 사용 (bcrypt는 GIL을 해제함)
+            logger.warning(f"해싱 프로세스 풀 생성 실패, 스레드 풀을 사용합니다: {e}")
+            self._executor = None
+    
+    async def shutdown(self) -> None:
+        """프로세스 풀 종료"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests. Please retry shortly."
+            )
+        self._pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self._pending -= 1
+            raise
+        # 호출한 요청이 취소되어도 풀의 작업은 끝까지 실행되므로, 작업이 끝날 때 대기 작업 수를 줄임
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+    
+    def _release(self, future: asyncio.Future) -> None:
+        self._pending -= 1
+        # 기다리던 요청이 취소된 경우에도 예외가 확인되지 않은 채 남지 않도록 조회
+        if not future.cancelled() and future.exception() is None:
+            self.completed += 1
+    
+    async def hash(self, password: str) -> str:
+        """비밀번호 해싱"""
+        return await self._submit(_hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """비밀번호 검증"""
+        return await self._submit(_verify, plain_password, hashed_password)
+    
+    async def _submit_bulk(self, fn, *args):
+        # 로그인 admission 한도(max_pending)에 포함하지 않고, 대량 작업 슬롯이 날 때까지 대기
+        await self._bulk_slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self._bulk_slots.release()
+            raise
+        self._bulk_running += 1
+        future.add_done_callback(self._release_bulk)
+        return await asyncio.shield(future)
+    
+    def _release_bulk(self, future: asyncio.Future) -> None:
+        self._bulk_running -= 1
+        self._bulk_slots.release()
+        if not future.cancelled() and future.exception() is None:
+            self.completed += 1
+    
+    async def hash_many(self, passwords: List[str]) -> List[Union[str, BaseException]]:
+        """
+        여러 비밀번호를 병렬로 해싱 (대량 등록용)
+        
+        로그인과 admission 한도를 공유하지 않으므로 503으로 거절되지 않으며,
+        bulk_concurrency개씩 실행합니다.
+        
+        Returns:
+            비밀번호 순서대로 해시 (해싱에 실패한 항목은 예외 객체)
+        """
+        return await asyncio.gather(
+            *[self._submit_bulk(_hash, password) for password in passwords],
+            return_exceptions=True
+        )
+    
+    def stats(self) -> Dict[str, int]:
+        """큐 지표 (실행 중 + 대기 중 작업 수, 거절 수 등)"""
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "queued": max(0, self._pending - self.max_workers),
+            "max_pending": self.max_pending,
+            "bulk_running": self._bulk_running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# 전역 해싱 실행기
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    bulk_concurrency=settings.PASSWORD_HASH_BULK_CONCURRENCY
+)
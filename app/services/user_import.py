@@ -0,0 +1,242 @@
+"""
+User bulk import service
+파트너 사용자 이전을 위한 대량 회원 등록 (CSV / NDJSON)
+
+- 업로드 본문은 임시 파일에 스풀링한 뒤 배치 단위로 처리합니다.
+- 비밀번호는 해싱 프로세스 풀에서 병렬로 해싱합니다.
+- users / outbox 행은 배치마다 multi-row insert 한 번으로 기록합니다.
+- Keycloak 계정은 outbox를 통해 제한된 동시성으로 즉시 생성하고,
+  실패한 항목은 백그라운드 워커가 이어서 재시도합니다.
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.models.user_provisioning import UserProvisioning
+from app.schemas.user import UserCreate
+from app.services.keycloak_provisioner import keycloak_provisioner
+from app.services.password_hasher import password_hasher
+from app.services.user_service import user_service
+
+# 지원하는 업로드 형식
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+# (줄 번호, 원본 행 또는 파싱 오류 메시지)
+ParsedRow = Tuple[int, Any]
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Content-Type에서 업로드 형식 추론"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return FORMAT_CSV
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return FORMAT_NDJSON
+    return None
+
+
+def _iter_rows(source: BinaryIO, fmt: str) -> Iterator[ParsedRow]:
+    """업로드 파일에서 행을 하나씩 읽음 (파싱 오류는 문자열로 반환)"""
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, "")}
+        return
+    
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, "Each line must be a JSON object"
+            continue
+        yield line_no, row
+
+
+class UserImportService:
+    """대량 회원 등록 서비스"""
+    
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+    
+    @staticmethod
+    async def _existing_emails(emails: List[str]) -> Set[str]:
+        """이미 등록된 이메일 조회 (IN 쿼리 한 번)"""
+        async with AsyncSessionLocal() as db:
+            result = await db.scalars(select(User.email).where(User.email.in_(emails)))
+            return set(result.all())
+    
+    @staticmethod
+    async def _insert_users(users: List[UserCreate], hashed_passwords: List[str], provisioning: bool) -> Dict[str, Optional[int]]:
+        """
+        users / outbox 행을 한 트랜잭션에서 multi-row insert
+        
+        사전 확인 이후 다른 요청이 같은 이메일을 등록해 배치 전체가 실패하면
+        행 단위(savepoint)로 다시 시도하여 충돌한 행만 제외합니다.
+        
+        Returns:
+            email -> user_id (중복으로 제외된 행은 None)
+        """
+        rows = [
+            {
+                "email": user.email,
+                "password_hash": hashed,
+                "region_code": user.region_code,
+                "subscription_status": user.subscription_status,
+            }
+            for user, hashed in zip(users, hashed_passwords)
+        ]
+        emails = [user.email for user in users]
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(insert(User), rows)
+            except IntegrityError:
+                await db.rollback()
+                for row in rows:
+                    try:
+                        async with db.begin_nested():
+                            await db.execute(insert(User), [row])
+                    except IntegrityError:
+                        pass
+            
+            # MySQL은 multi-row insert의 RETURNING을 지원하지 않으므로 id는 한 번에 다시 조회
+            # (행 단위 재시도에서 충돌한 이메일은 다른 요청이 등록한 것이므로 제외)
+            result = await db.execute(
+                select(User.id, User.email).where(
+                    User.email.in_(emails),
+                    User.password_hash.in_(hashed_passwords)
+                )
+            )
+            inserted = {row.email: row.id for row in result.all()}
+            if provisioning and inserted:
+                await db.execute(insert(UserProvisioning), [
+                    keycloak_provisioner.outbox_values(
+                        inserted[user.email],
+                        user.email,
+                        user.password,
+                        user.first_name,
+                        user.last_name
+                    )
+                    for user in users if user.email in inserted
+                ])
+            await db.commit()
+            return {email: inserted.get(email) for email in emails}
+    
+    async def _import_batch(self, batch: List[ParsedRow], seen: Set[str]) -> List[Dict[str, Any]]:
+        """배치 하나 처리 후 행별 결과 반환 (입력 순서 유지)"""
+        results: List[Dict[str, Any]] = []
+        valid: List[Tuple[Dict[str, Any], UserCreate]] = []
+        
+        for line_no, row in batch:
+            result: Dict[str, Any] = {"line": line_no}
+            results.append(result)
+            if isinstance(row, str):
+                result.update(status="invalid", error=row)
+                continue
+            try:
+                user = UserCreate(**row)
+            except ValidationError as e:
+                # 입력값(비밀번호 포함)은 응답에 넣지 않음
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                result.update(email=row.get("email"), status="invalid", error=error)
+                continue
+            result["email"] = user.email
+            if user.email in seen:
+                result.update(status="duplicate", error="Duplicate email in upload")
+                continue
+            seen.add(user.email)
+            valid.append((result, user))
+        
+        if not valid:
+            return results
+        
+        try:
+            existing = await self._existing_emails([user.email for _, user in valid])
+            for result, user in valid:
+                if user.email in existing:
+                    result.update(status="duplicate", error="Email already registered")
+            valid = [(result, user) for result, user in valid if user.email not in existing]
+            if not valid:
+                return results
+            
+            # 해싱에 실패한 행만 실패로 보고하고 나머지는 등록
+            hashed = await password_hasher.hash_many([user.password for _, user in valid])
+            hashed_passwords = []
+            for (result, _), hashed_password in zip(valid, hashed):
+                if isinstance(hashed_password, BaseException):
+                    result.update(status="failed", error=f"Password hashing failed: {hashed_password}")
+                else:
+                    hashed_passwords.append(hashed_password)
+            valid = [(result, user) for result, user in valid if result.get("status") != "failed"]
+            if not valid:
+                return results
+            users = [user for _, user in valid]
+            provisioning = keycloak_provisioner.enabled()
+            user_ids = await self._insert_users(users, hashed_passwords, provisioning)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            for result, _ in valid:
+                result.update(status="failed", error=detail)
+            return results
+        
+        created = []
+        for result, user in valid:
+            user_id = user_ids.get(user.email)
+            if user_id is None:
+                result.update(status="duplicate", error="Email already registered")
+                continue
+            result.update(status="created", user_id=user_id)
+            created.append(result)
+        user_service.invalidate_user_id_cache(*[result["email"] for result in created])
+        
+        if provisioning and created:
+            # outbox 항목을 바로 처리 (실패 항목은 백그라운드 워커가 재시도)
+            try:
+                outcomes = await keycloak_provisioner.provision_users([result["user_id"] for result in created])
+            except Exception:
+                outcomes = {}
+                keycloak_provisioner.notify()
+            for result in created:
+                result["keycloak"] = outcomes.get(result["user_id"], "queued")
+        return results
+    
+    async def import_users(self, source: BinaryIO, fmt: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        업로드 파일의 사용자를 배치 단위로 등록하며 행별 결과를 순서대로 반환
+        
+        Args:
+            source: 스풀링된 업로드 파일 (바이너리)
+            fmt: "csv" 또는 "ndjson"
+        
+        Yields:
+            행별 결과, 마지막에 {"summary": {...}}
+        """
+        rows = _iter_rows(source, fmt)
+        seen: Set[str] = set()
+        summary: Dict[str, int] = {"total": 0}
+        while True:
+            batch = [row for _, row in zip(range(self.batch_size), rows)]
+            if not batch:
+                break
+            for result in await self._import_batch(batch, seen):
+                summary["total"] += 1
+                summary[result["status"]] = summary.get(result["status"], 0) + 1
+                yield result
+        yield {"summary": summary}
+
+
+# 전역 대량 등록 서비스
+user_import_service = UserImportService(batch_size=settings.BULK_IMPORT_BATCH_SIZE)
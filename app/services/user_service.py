@@ -3,17 +3,25 @@ User service
 사용자 관련 비즈니스 로직
 """
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-import httpx
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.services.password_hasher import password_hasher, pwd_context
+from app.services.keycloak_provisioner import keycloak_provisioner
 
-# 비밀번호 해싱 컨텍스트
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# (JWT sub, email) -> DB user_id 캐시, email -> _NOT_REGISTERED 음성 캐시 (미등록 사용자, 짧게 유지)
+# 토큰 주체(sub)를 키에 포함하므로 이메일이 변경되어 다른 사용자가 같은 이메일로 가입해도
+# 새 사용자의 토큰에는 이전 사용자의 id가 적용되지 않습니다 (워커 간 무효화가 필요 없음).
+_NOT_REGISTERED = 0
+user_id_cache = TTLCache(
+    maxsize=settings.USER_ID_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_ID_CACHE_TTL_SECONDS
+)
 
 
 class UserService:
@@ -30,17 +38,28 @@ class UserService:
         return pwd_context.verify(plain_password, hashed_password)
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def hash_password_async(password: str) -> str:
+        """비밀번호 해싱 (해싱 전용 프로세스 풀에서 실행, 이벤트 루프 비차단)"""
+        return await password_hasher.hash(password)
+    
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """비밀번호 검증 (해싱 전용 프로세스 풀에서 실행, 이벤트 루프 비차단)"""
+        return await password_hasher.verify(plain_password, hashed_password)
+    
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """이메일로 사용자 조회"""
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def get_user_id_from_jwt(db: Session, jwt_payload: dict) -> Optional[int]:
+    async def get_user_id_from_jwt(db: AsyncSession, jwt_payload: dict) -> Optional[int]:
         """
         JWT 토큰 페이로드에서 DB user_id 가져오기
         
         JWT 토큰의 email 필드를 사용하여 DB users 테이블에서
-        해당 사용자의 id를 조회합니다.
+        해당 사용자의 id를 조회합니다. 조회 결과는 토큰의 sub와 email을 함께 키로 캐시합니다.
         
         Args:
             db: 데이터베이스 세션
@@ -54,34 +73,51 @@ class UserService:
         if not email:
             return None
         
-        # DB에서 email로 사용자 조회
-        user = UserService.get_user_by_email(db, email)
-        if not user:
+        # sub가 없는 토큰은 다른 사용자의 토큰과 구분할 수 없으므로 캐시하지 않음
+        subject = jwt_payload.get("sub")
+        key = (subject, email) if subject else None
+        if key is not None:
+            cached_id = user_id_cache.get(key)
+            if cached_id is not None:
+                return cached_id
+        if user_id_cache.get(email) == _NOT_REGISTERED:
+            return None
+        
+        # DB에서 email로 사용자 id만 조회
+        user_id = await db.scalar(select(User.id).where(User.email == email))
+        if not user_id:
+            user_id_cache.set(email, _NOT_REGISTERED, ttl_seconds=settings.USER_ID_NEGATIVE_CACHE_TTL_SECONDS)
             return None
         
-        return user.id
+        if key is not None:
+            user_id_cache.set(key, user_id)
+        return user_id
     
     @staticmethod
-    async def create_user(db: Session, user_data: UserCreate) -> User:
-        """사용자 생성"""
+    def invalidate_user_id_cache(*emails: Optional[str]) -> None:
+        """미등록 음성 캐시 무효화 (가입, 이메일 변경 시)"""
+        for email in emails:
+            if email:
+                user_id_cache.delete(email)
+    
+    @staticmethod
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
+        """
+        사용자 생성
+        
+        Keycloak 사용자 생성은 같은 트랜잭션에 기록한 outbox 항목을
+        백그라운드 워커(keycloak_provisioner)가 처리하므로, DB 커밋까지만 기다립니다.
+        """
         # 이메일 중복 확인
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        # Keycloak에 사용자 생성 (선택적 - 실패해도 계속 진행)
-        keycloak_user_id = None
-        try:
-            keycloak_user_id = await UserService._create_keycloak_user(user_data)
-        except Exception as e:
-            # Keycloak이 없거나 접근 불가능한 경우 경고만 출력하고 계속 진행
-            print(f"⚠️  Keycloak 사용자 생성 실패 (무시하고 계속 진행): {str(e)}")
-        
         # 데이터베이스에 사용자 생성
-        hashed_password = UserService.hash_password(user_data.password)
+        hashed_password = await UserService.hash_password_async(user_data.password)
         db_user = User(
             email=user_data.email,
             password_hash=hashed_password,
@@ -89,109 +125,56 @@ class UserService:
             subscription_status=user_data.subscription_status
         )
         
+        provisioning = keycloak_provisioner.enabled()
         try:
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
-            return db_user
+            if provisioning:
+                # outbox 항목은 사용자 id가 필요하므로 flush 후 같은 트랜잭션에 추가
+                await db.flush()
+                keycloak_provisioner.enqueue(
+                    db,
+                    db_user,
+                    user_data.password,
+                    first_name=user_data.first_name,
+                    last_name=user_data.last_name
+                )
+            await db.commit()
+            await db.refresh(db_user)
         except IntegrityError:
-            db.rollback()
-            # Keycloak 사용자 삭제 시도
-            if keycloak_user_id:
-                try:
-                    await UserService._delete_keycloak_user(keycloak_user_id)
-                except Exception:
-                    pass  # 삭제 실패는 무시
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to create user"
             )
-    
-    @staticmethod
-    async def _create_keycloak_user(user_data: UserCreate) -> str:
-        """Keycloak에 사용자 생성"""
-        from app.services.auth import auth_service
-        
-        admin_token = await auth_service._get_admin_token()
-        if not admin_token:
-            raise ValueError("Admin token not available")
         
-        url = f"{auth_service.keycloak_url}/admin/realms/{auth_service.realm}/users"
-        user_payload = {
-            "username": user_data.email,
-            "email": user_data.email,
-            "enabled": True,
-            "emailVerified": True,  # 회원가입 시 이메일 인증 완료로 설정
-            "credentials": [{
-                "type": "password",
-                "value": user_data.password,
-                "temporary": False
-            }]
-        }
-        
-        # firstName과 lastName 추가 (Keycloak에서 필요)
-        if user_data.first_name:
-            user_payload["firstName"] = user_data.first_name
-        if user_data.last_name:
-            user_payload["lastName"] = user_data.last_name
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {admin_token}",
-                    "Content-Type": "application/json"
-                },
-                json=user_payload,
-                timeout=10.0
-            )
-            response.raise_for_status()
-            # Keycloak은 Location 헤더에 사용자 ID를 반환
-            location = response.headers.get("Location", "")
-            if location:
-                return location.split("/")[-1]
-            raise ValueError("Failed to get user ID from Keycloak")
-    
-    @staticmethod
-    async def _delete_keycloak_user(user_id: str):
-        """Keycloak에서 사용자 삭제"""
-        from app.services.auth import auth_service
-        
-        admin_token = await auth_service._get_admin_token()
-        if not admin_token:
-            return
-        
-        url = f"{auth_service.keycloak_url}/admin/realms/{auth_service.realm}/users/{user_id}"
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.delete(
-                    url,
-                    headers={"Authorization": f"Bearer {admin_token}"},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-            except Exception:
-                pass  # 삭제 실패는 무시
+        # 가입 전 조회로 남은 음성 캐시 제거
+        UserService.invalidate_user_id_cache(db_user.email)
+        if provisioning:
+            keycloak_provisioner.notify()
+        else:
+            # Keycloak이 없거나 관리자 계정이 설정되지 않은 경우 경고만 출력
+            print("⚠️  Keycloak Admin API가 설정되지 않아 Keycloak 사용자 생성을 건너뜁니다")
+        return db_user
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """ID로 사용자 조회"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
+    async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) -> User:
         """사용자 정보 수정"""
-        user = UserService.get_user_by_id(db, user_id)
+        user = await UserService.get_user_by_id(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
+        old_email = user.email
         if user_data.email and user_data.email != user.email:
             # 이메일 중복 확인
-            existing_user = db.query(User).filter(User.email == user_data.email).first()
+            existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -205,8 +188,10 @@ class UserService:
         if user_data.subscription_status is not None:
             user.subscription_status = user_data.subscription_status
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        if user.email != old_email:
+            UserService.invalidate_user_id_cache(old_email, user.email)
         return user
 
 
@@ -0,0 +1,156 @@
+"""
+Watch history service
+시청기록 진행 위치 저장 (dialect별 단일 upsert)
+
+플레이어 heartbeat마다 컨텐츠/기존 기록을 조회한 뒤 INSERT/UPDATE 하던 것을
+(user_id, content_id) unique 키 기준 upsert 한 문장으로 처리합니다.
+컨텐츠 존재 여부는 별도 조회 대신 FK 제약 위반(IntegrityError)으로 판단합니다.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.watch_history import WatchHistory
+
+
+def dialect_name(db: AsyncSession) -> str:
+    """세션이 연결된 DB 종류 (mysql, sqlite, ...)"""
+    return db.get_bind().dialect.name
+
+
+def upsert_statement(dialect: str, rows: List[Dict[str, Any]]):
+    """
+    (user_id, content_id) 기준 upsert 문
+    
+    - MySQL: INSERT ... ON DUPLICATE KEY UPDATE (id = LAST_INSERT_ID(id)로 기존 행의 id도 lastrowid로 반환)
+    - SQLite/PostgreSQL: INSERT ... ON CONFLICT (user_id, content_id) DO UPDATE
+    
+    Args:
+        dialect: DB 종류
+        rows: user_id, content_id, last_played_time, updated_at 값
+    """
+    if dialect == "mysql":
+        stmt = mysql.insert(WatchHistory).values(rows)
+        return stmt.on_duplicate_key_update([
+            ("id", func.last_insert_id(WatchHistory.id)),
+            ("last_played_time", stmt.inserted.last_played_time),
+            ("updated_at", stmt.inserted.updated_at),
+        ])
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(WatchHistory).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[WatchHistory.user_id, WatchHistory.content_id],
+            set_={
+                "last_played_time": stmt.excluded.last_played_time,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+    raise NotImplementedError(f"Watch history upsert is not supported for {dialect}")
+
+
+def progress_update_statement():
+    """
+    기존 시청기록의 시청 위치 갱신 문 (executemany용, write-behind 버퍼 기록에 사용)
+    
+    행을 새로 만들지 않으므로, 다른 워커에서 삭제된 시청기록은 버퍼 기록으로 되살아나지 않습니다.
+    기존 행보다 updated_at이 늦은 경우에만 갱신하여 여러 파드의 지연 기록이 순서를 거스르지 않도록 합니다.
+    
+    파라미터: b_user_id, b_content_id, b_last_played_time, b_updated_at
+    """
+    table = WatchHistory.__table__
+    return update(table).where(
+        table.c.user_id == bindparam("b_user_id"),
+        table.c.content_id == bindparam("b_content_id"),
+        table.c.updated_at <= bindparam("b_updated_at")
+    ).values(
+        last_played_time=bindparam("b_last_played_time"),
+        updated_at=bindparam("b_updated_at")
+    )
+
+
+def missing_reference_error(error: IntegrityError) -> HTTPException:
+    """FK 제약 위반을 404로 변환 (SQLite는 어떤 FK인지 알려주지 않으므로 컨텐츠로 간주)"""
+    if "user_id" in str(error.orig):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found in database. Please register first."
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Content not found"
+    )
+
+
+class WatchHistoryService:
+    """시청기록 저장 서비스"""
+    
+    @staticmethod
+    async def save_progress(db: AsyncSession, user_id: int, content_id: int, last_played_time: float) -> WatchHistory:
+        """
+        시청 위치 저장 (없으면 생성, 있으면 갱신) - DB 왕복 한 번
+        
+        Args:
+            db: 데이터베이스 세션 (primary)
+            user_id: 사용자 ID
+            content_id: 컨텐츠 ID
+            last_played_time: 마지막 재생 시간 (초)
+        
+        Returns:
+            저장된 시청기록 (세션에 연결되지 않은 객체)
+        
+        Raises:
+            HTTPException: 컨텐츠(또는 사용자)가 없는 경우 (404)
+        """
+        # updated_at은 응답에 다시 조회하지 않도록 애플리케이션에서 지정 (UTC)
+        row = {
+            "user_id": user_id,
+            "content_id": content_id,
+            "last_played_time": last_played_time,
+            "updated_at": datetime.utcnow(),
+        }
+        dialect = dialect_name(db)
+        stmt = upsert_statement(dialect, [row])
+        if dialect != "mysql":
+            stmt = stmt.returning(WatchHistory.id)
+        try:
+            result = await db.execute(stmt)
+            history_id = result.lastrowid if dialect == "mysql" else result.scalar_one()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise missing_reference_error(e)
+        return WatchHistory(id=history_id, **row)
+    
+    @staticmethod
+    async def update_progress(db: AsyncSession, user_id: int, content_id: int, last_played_time: float) -> Optional[WatchHistory]:
+        """
+        기존 시청기록의 시청 위치 갱신 (UPDATE 한 번)
+        
+        Returns:
+            갱신된 시청기록, 기록이 없으면 None
+        """
+        values: Dict[str, Any] = {"last_played_time": last_played_time, "updated_at": datetime.utcnow()}
+        dialect = dialect_name(db)
+        stmt = update(WatchHistory).where(
+            WatchHistory.user_id == user_id,
+            WatchHistory.content_id == content_id
+        )
+        if dialect == "mysql":
+            # RETURNING 대신 LAST_INSERT_ID(id)로 갱신한 행의 id를 받음
+            result = await db.execute(stmt.values(id=func.last_insert_id(WatchHistory.id), **values))
+            history_id = result.lastrowid if result.rowcount else None
+        else:
+            result = await db.execute(stmt.values(**values).returning(WatchHistory.id))
+            history_id = result.scalar_one_or_none()
+        await db.commit()
+        if history_id is None:
+            return None
+        return WatchHistory(id=history_id, user_id=user_id, content_id=content_id, **values)
+
+
+# 전역 시청기록 서비스
+watch_history_service = WatchHistoryService()
@@ -0,0 +1,276 @@
+"""
+Watch progress write-behind buffer
+플레이어 heartbeat(시청 위치 저장)를 메모리에 모았다가 주기적으로 한 번에 기록합니다.
+
+- (user_id, content_id)별 최신 last_played_time만 보관하고, 주기(WATCH_PROGRESS_FLUSH_INTERVAL_SECONDS) 또는
+  대기 항목 수(WATCH_PROGRESS_MAX_PENDING)에 도달하면 기존 행을 갱신하는 UPDATE(executemany)로 기록합니다.
+- 직전 값과의 차이가 WATCH_PROGRESS_MIN_DELTA_SECONDS 미만인 heartbeat(일시정지 등)는 버립니다.
+- 처음 보는 (user_id, content_id)는 즉시 upsert하여 컨텐츠 존재 여부(404)와 id를 확인한 뒤부터 버퍼에 보관합니다.
+  행은 이때 만들어지므로 버퍼 기록은 행을 새로 만들지 않고, 다른 워커에서 삭제된 시청기록은 되살아나지 않습니다.
+  (갱신할 행이 없는 항목은 버퍼에서 제거되며, 이후 저장 요청은 다시 즉시 upsert됩니다.)
+- 조회(get_watch_history_by_content)는 아직 기록되지 않은 버퍼 값을 우선 반환하여 기록 전에도 방금 저장한 값을 읽습니다.
+- 종료 시 남은 항목을 기록합니다. 비정상 종료 시에는 최대 한 주기만큼의 진행 위치가 유실될 수 있습니다.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.watch_history import WatchHistory
+from app.services.watch_history_service import progress_update_statement, watch_history_service
+
+logger = logging.getLogger(__name__)
+
+# 한 문장으로 기록하는 최대 행 수
+_FLUSH_CHUNK_SIZE = 500
+# 기록이 끝난 뒤 이 시간 동안 heartbeat가 없는 항목은 버퍼에서 제거
+_IDLE_SECONDS = 600.0
+
+_Key = Tuple[int, int]
+
+
+class _Progress:
+    """버퍼에 보관하는 시청기록 (DB 행과 같은 값)"""
+    
+    def __init__(self, history: WatchHistory):
+        self.id = history.id
+        self.last_played_time = history.last_played_time
+        self.updated_at = history.updated_at
+        self.touched_at = time.monotonic()
+    
+    def to_model(self, key: _Key) -> WatchHistory:
+        return WatchHistory(
+            id=self.id,
+            user_id=key[0],
+            content_id=key[1],
+            last_played_time=self.last_played_time,
+            updated_at=self.updated_at
+        )
+
+
+class WatchProgressBuffer:
+    """시청 위치 write-behind 버퍼 (워커 프로세스별)"""
+    
+    def __init__(self, enabled: bool, flush_interval: float, max_pending: int, min_delta: float):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.min_delta = min_delta
+        self._entries: Dict[_Key, _Progress] = {}
+        self._dirty: Set[_Key] = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._received = 0
+        self._dropped = 0
+        self._flushed_rows = 0
+        self._flushes = 0
+        self._flush_errors = 0
+    
+    def _remember(self, history: WatchHistory) -> None:
+        """DB에 기록된 시청기록을 버퍼에 등록 (이후 heartbeat는 버퍼에 모음)"""
+        if self.enabled:
+            key = (history.user_id, history.content_id)
+            self._entries[key] = _Progress(history)
+            self._dirty.discard(key)
+    
+    def _record(self, key: _Key, entry: _Progress, last_played_time: float) -> WatchHistory:
+        """heartbeat를 버퍼에 반영 (변화가 작으면 버림)"""
+        self._received += 1
+        entry.touched_at = time.monotonic()
+        if abs(last_played_time - entry.last_played_time) < self.min_delta:
+            self._dropped += 1
+            return entry.to_model(key)
+        entry.last_played_time = last_played_time
+        entry.updated_at = datetime.utcnow()
+        self._dirty.add(key)
+        if len(self._dirty) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+        return entry.to_model(key)
+    
+    async def save(self, db: AsyncSession, user_id: int, content_id: int, last_played_time: float) -> WatchHistory:
+        """
+        시청 위치 저장 (없으면 생성, 있으면 갱신)
+        
+        Args:
+            db: 데이터베이스 세션 (버퍼에 없는 항목을 즉시 기록할 때 사용)
+            user_id: 사용자 ID
+            content_id: 컨텐츠 ID
+            last_played_time: 마지막 재생 시간 (초)
+        
+        Raises:
+            HTTPException: 컨텐츠(또는 사용자)가 없는 경우 (404)
+        """
+        key = (user_id, content_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return self._record(key, entry, last_played_time)
+        history = await watch_history_service.save_progress(db, user_id, content_id, last_played_time)
+        self._remember(history)
+        return history
+    
+    async def update(self, db: AsyncSession, user_id: int, content_id: int, last_played_time: float) -> Optional[WatchHistory]:
+        """
+        기존 시청기록의 시청 위치 갱신
+        
+        Returns:
+            갱신된 시청기록, 기록이 없으면 None
+        """
+        key = (user_id, content_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return self._record(key, entry, last_played_time)
+        history = await watch_history_service.update_progress(db, user_id, content_id, last_played_time)
+        if history is not None:
+            self._remember(history)
+        return history
+    
+    def get(self, user_id: int, content_id: int) -> Optional[WatchHistory]:
+        """
+        아직 기록되지 않은 버퍼의 최신 시청기록 (없으면 None, DB에서 조회)
+        
+        기록이 끝난 항목은 DB 값을 읽도록 하여, 다른 워커에서 삭제/갱신된 시청기록을 오래 가리지 않습니다.
+        """
+        key = (user_id, content_id)
+        if key not in self._dirty:
+            return None
+        entry = self._entries.get(key)
+        return entry.to_model(key) if entry is not None else None
+    
+    async def discard(self, user_id: int, content_id: int) -> None:
+        """
+        시청기록 삭제 전에 이 워커의 버퍼 항목 제거
+        
+        진행 중인 기록이 끝난 뒤 제거합니다. 다른 워커의 버퍼 항목은 남아 있지만,
+        버퍼 기록은 기존 행만 갱신하므로 삭제된 행을 되살리지 않고 다음 기록 시 제거됩니다.
+        """
+        key = (user_id, content_id)
+        if key not in self._entries:
+            return
+        async with self._lock:
+            self._entries.pop(key, None)
+            self._dirty.discard(key)
+    
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """기존 행을 UPDATE(executemany)로 갱신하고, DB에 행이 없는 항목은 버퍼에서 제거"""
+        stmt = progress_update_statement()
+        async with AsyncSessionLocal() as db:
+            sane_rowcount = db.get_bind().dialect.supports_sane_multi_rowcount
+            for start in range(0, len(rows), _FLUSH_CHUNK_SIZE):
+                chunk = rows[start:start + _FLUSH_CHUNK_SIZE]
+                result = await db.execute(stmt, chunk)
+                await db.commit()
+                if not sane_rowcount or result.rowcount < len(chunk):
+                    await self._forget_deleted(db, chunk)
+    
+    async def _forget_deleted(self, db: AsyncSession, chunk: List[Dict[str, Any]]) -> None:
+        """
+        갱신되지 않은 항목 중 행이 삭제된 항목을 버퍼에서 제거
+        
+        (다른 워커에서 시청기록 삭제, 사용자/컨텐츠 삭제로 인한 CASCADE)
+        updated_at이 더 늦은 다른 기록이 있어 갱신되지 않은 항목은 남겨 둡니다.
+        """
+        keys = [(row["b_user_id"], row["b_content_id"]) for row in chunk]
+        existing = set((await db.execute(
+            select(WatchHistory.user_id, WatchHistory.content_id)
+            .where(tuple_(WatchHistory.user_id, WatchHistory.content_id).in_(keys))
+        )).tuples().all())
+        await db.commit()
+        for key in keys:
+            if key not in existing:
+                self._entries.pop(key, None)
+                logger.info(f"시청기록 버퍼 항목 제거 (삭제된 시청기록): user_id={key[0]}, content_id={key[1]}")
+    
+    async def flush(self) -> int:
+        """
+        대기 중인 시청 위치를 DB에 기록
+        
+        Returns:
+            기록한 행 수 (실패 시 0, 항목은 다음 주기에 다시 기록)
+        """
+        async with self._lock:
+            keys = [key for key in self._dirty if key in self._entries]
+            self._dirty.clear()
+            if keys:
+                rows = [
+                    {
+                        "b_user_id": key[0],
+                        "b_content_id": key[1],
+                        "b_last_played_time": self._entries[key].last_played_time,
+                        "b_updated_at": self._entries[key].updated_at,
+                    }
+                    for key in keys
+                ]
+                try:
+                    await self._write(rows)
+                except Exception as e:
+                    # 기록 중 새로 들어온 값은 그대로 두고, 실패한 항목을 다시 대기 상태로
+                    self._flush_errors += 1
+                    self._dirty.update(key for key in keys if key in self._entries)
+                    logger.warning(f"시청기록 버퍼 기록 실패 ({len(rows)}건, 다음 주기에 재시도): {e}")
+                    return 0
+                self._flushes += 1
+                self._flushed_rows += len(rows)
+            
+            idle_before = time.monotonic() - _IDLE_SECONDS
+            for key in [key for key, entry in self._entries.items() if entry.touched_at < idle_before and key not in self._dirty]:
+                del self._entries[key]
+            return len(keys)
+    
+    def stats(self) -> Dict[str, int]:
+        """메트릭용 통계"""
+        return {
+            "entries": len(self._entries),
+            "pending": len(self._dirty),
+            "received": self._received,
+            "dropped": self._dropped,
+            "flushed_rows": self._flushed_rows,
+            "flushes": self._flushes,
+            "flush_errors": self._flush_errors,
+        }
+    
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"시청기록 버퍼 기록 실패: {e}")
+    
+    def start(self) -> None:
+        """주기적 기록 시작"""
+        if not self.enabled or (self._task and not self._task.done()):
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run_loop())
+    
+    async def stop(self) -> None:
+        """주기적 기록 종료 후 남은 항목 기록"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        if self._dirty:
+            flushed = await self.flush()
+            print(f"✅ Flushed {flushed} buffered watch progress entries")
+
+
+# 전역 시청 위치 버퍼
+watch_progress_buffer = WatchProgressBuffer(
+    enabled=settings.WATCH_PROGRESS_BUFFER_ENABLED,
+    flush_interval=settings.WATCH_PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.WATCH_PROGRESS_MAX_PENDING,
+    min_delta=settings.WATCH_PROGRESS_MIN_DELTA_SECONDS
+)
@@ -4,8 +4,16 @@ FastAPI Backend Application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import Base, engine
-from app.api.v1.routes import health, users, auth, contents, content_likes, watch_history, video_assets, search
+from app.core.database import engine, db_router
+from app.core.schema import ReadOnlyModeMiddleware, schema_guard
+from app.core.http_client import get_http_client, close_http_client
+from app.core.security import jwks_key_store
+from app.services.auth import auth_service
+from app.services.password_hasher import password_hasher
+from app.services.keycloak_provisioner import keycloak_provisioner
+from app.services.watch_progress_buffer import watch_progress_buffer
+from app.services.like_counter import like_counter
+from app.api.v1.routes import health, users, auth, contents, content_likes, watch_history, video_assets, search, metrics
 
 import os
 
@@ -54,20 +62,50 @@ async def get_openapi_endpoint():
         routes=app.routes
     )
 
-# 데이터베이스 테이블 생성 (개발용)
-# 프로덕션에서는 Alembic 마이그레이션 사용
-# 연결 실패 시에도 애플리케이션은 시작되도록 예외 처리
+# 데이터베이스 스키마 확인 (테이블 생성/마이그레이션은 scripts/migrate.py에서 수행)
+# alembic_version 조회 한 번으로 코드의 마이그레이션 head와 비교
+# SCHEMA_CHECK_MODE=fail(기본)이면 불일치 시 기동 실패, readonly이면 읽기에 영향 없는 한 리비전 차이일 때만 쓰기를 거절하며 계속 실행
 @app.on_event("startup")
 async def startup_event():
-    import asyncio
-    try:
-        # 데이터베이스 연결을 별도 스레드에서 실행하여 블로킹 방지
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, lambda: Base.metadata.create_all(bind=engine))
-        print("✅ Database tables created successfully")
-    except Exception as e:
-        print(f"⚠️  Database connection failed during startup: {str(e)}")
-        print("   Application will continue, but database features may not work.")
+    await schema_guard.check()
+    
+    # Keycloak 호출용 공용 HTTP 클라이언트 (keep-alive 커넥션 풀)
+    get_http_client()
+    
+    # JWKS 공개 키 백그라운드 갱신 시작
+    jwks_key_store.start()
+    
+    # Keycloak 관리자 토큰 선제 갱신 시작
+    auth_service.admin_tokens.start()
+    
+    # bcrypt 해싱 전용 프로세스 풀 시작
+    password_hasher.start()
+    
+    # 회원가입 outbox를 읽어 Keycloak 사용자를 생성하는 워커 시작
+    keycloak_provisioner.start()
+    
+    # 시청 위치 write-behind 버퍼 주기적 기록 시작
+    watch_progress_buffer.start()
+    
+    # 좋아요 분산 카운터를 contents.like_count로 주기적 롤업
+    like_counter.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await keycloak_provisioner.stop()
+    # DB 엔진을 닫기 전에 남은 시청 위치 기록
+    await watch_progress_buffer.stop()
+    await like_counter.stop()
+    await jwks_key_store.stop()
+    await auth_service.admin_tokens.stop()
+    await password_hasher.shutdown()
+    await close_http_client()
+    await db_router.dispose()
+    await engine.dispose()
+
+# 스키마가 맞지 않는 동안 쓰기 요청 거절 (SCHEMA_CHECK_MODE=readonly)
+app.add_middleware(ReadOnlyModeMiddleware, guard=schema_guard)
 
 # CORS 설정
 app.add_middleware(
@@ -76,6 +114,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 목록 API의 다음 페이지 커서
 )
 
 # 라우터 등록
@@ -84,9 +123,11 @@ app.include_router(auth.router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1", tags=["Users"])
 app.include_router(contents.router, prefix="/api/v1", tags=["Contents"])
 app.include_router(content_likes.router, prefix="/api/v1", tags=["Content Likes"])
+app.include_router(content_likes.my_likes_router, prefix="/api/v1", tags=["Content Likes"])
 app.include_router(watch_history.router, prefix="/api/v1", tags=["Watch History"])
 app.include_router(video_assets.router, prefix="/api/v1", tags=["Video Assets"])
 app.include_router(search.router, prefix="/api/v1", tags=["Search"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["Metrics"])
 
 
 @app.get("/")
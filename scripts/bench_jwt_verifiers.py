@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+JWT 검증기 마이크로벤치마크
+각 검증기 백엔드(JWT_VERIFIER_BACKEND)의 초당 검증 횟수를 측정합니다.
+
+사용법:
+    python scripts/bench_jwt_verifiers.py [반복 횟수]
+"""
+import os
+import sys
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from app.core.security import JWT_VERIFIERS, JoseJWTVerifier
+
+ISSUER = "http://keycloak.local/realms/bench"
+
+
+def make_token():
+    """벤치마크용 RSA 키와 RS256 토큰 생성"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode()
+    token = jwt.encode(
+        {
+            "sub": "bench-user",
+            "email": "bench@example.com",
+            "iss": ISSUER,
+            "exp": int(time.time()) + 3600,
+        },
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": "bench-kid"}
+    )
+    return private_key.public_key(), token
+
+
+def bench(label, verify, iterations):
+    """verify()를 반복 호출하여 초당 검증 횟수 출력"""
+    verify()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(iterations):
+        verify()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {iterations / elapsed:>12,.0f} verifications/sec")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    public_key, token = make_token()
+    public_pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    
+    print(f"=== JWT 검증기 벤치마크 ({iterations}회) ===\n")
+    
+    # 기존 방식: 요청마다 PEM 문자열을 다시 파싱
+    jose_verifier = JoseJWTVerifier()
+    bench("jose (PEM per call)", lambda: jose_verifier.verify(token, public_pem, ISSUER), iterations)
+    
+    for name, verifier_cls in JWT_VERIFIERS.items():
+        verifier = verifier_cls()
+        bench(name, lambda: verifier.verify(token, public_key, ISSUER), iterations)
+
+
+if __name__ == "__main__":
+    main()
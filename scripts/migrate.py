@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+DB 마이그레이션 일회성 실행
+배포 전에 Kubernetes Job / initContainer 또는 docker compose의 migrate 서비스로 한 번 실행합니다.
+(API 파드는 기동 시 스키마 리비전만 확인하고 테이블을 만들지 않습니다.)
+
+- 기존 create_all로 만들어진 DB(alembic_version 없이 테이블만 있음)는 stamp 후 업그레이드
+  (현재 모델과 스키마가 같으면 head, 아니면 DB에 있는 테이블/인덱스로 맞는 리비전을 찾아 stamp)
+- MySQL에서는 GET_LOCK으로 동시에 여러 마이그레이션이 실행되지 않도록 함
+
+사용법:
+    python scripts/migrate.py            # head까지 업그레이드
+    python scripts/migrate.py --check    # 현재 리비전과 head만 출력 (불일치 시 종료 코드 1)
+"""
+import argparse
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alembic import command
+from alembic.config import Config
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  (모델 메타데이터 등록)
+from app.core.database import Base, database_url, to_sync_url
+from app.core.schema import get_script_directory
+
+# create_all 시절 스키마에 해당하는 가장 오래된 리비전
+LEGACY_BASELINE_REVISION = "0001"
+# 리비전별로 처음 생기는 테이블/인덱스 (최신 리비전부터, 인덱스가 None이면 테이블만 확인)
+LEGACY_REVISION_MARKERS = [
+    ("0004", "contents_likes", "ix_contents_likes_user_created"),
+    ("0003", "content_like_counters", None),
+    ("0002", "watch_history", "uq_watch_history_user_content"),
+    ("0001a", "user_provisioning_outbox", None),
+]
+LOCK_NAME = "backend_alembic_migrate"
+LOCK_TIMEOUT_SECONDS = 600
+
+
+def detect_legacy_revision(connection) -> str:
+    """alembic_version 없는 DB의 스키마에 해당하는 리비전 (있는 테이블/인덱스 중 가장 최신 리비전)"""
+    inspector = inspect(connection)
+    for revision, table, index in LEGACY_REVISION_MARKERS:
+        if not inspector.has_table(table):
+            continue
+        if index is None or index in {ix["name"] for ix in inspector.get_indexes(table)}:
+            return revision
+    return LEGACY_BASELINE_REVISION
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="마이그레이션 없이 리비전만 확인")
+    args = parser.parse_args()
+
+    head = get_script_directory().get_current_head()
+    engine = create_engine(to_sync_url(database_url), poolclass=NullPool)
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+
+    with engine.connect() as connection:
+        is_mysql = connection.dialect.name == "mysql"
+        if is_mysql and not args.check:
+            if connection.scalar(text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT_SECONDS}) != 1:
+                print(f"❌ Could not acquire migration lock '{LOCK_NAME}' within {LOCK_TIMEOUT_SECONDS}s")
+                sys.exit(1)
+            connection.commit()
+        try:
+            current = MigrationContext.configure(connection).get_current_revision()
+            print(f"Current revision: {current or '(none)'}, head: {head}")
+            if args.check:
+                sys.exit(0 if current == head else 1)
+
+            config.attributes["connection"] = connection
+            if current is None and inspect(connection).has_table("users"):
+                matches_models = not compare_metadata(MigrationContext.configure(connection), Base.metadata)
+                baseline = "head" if matches_models else detect_legacy_revision(connection)
+                print(f"Existing tables without alembic_version; stamping {baseline}")
+                command.stamp(config, baseline)
+                connection.commit()
+            command.upgrade(config, "head")
+            connection.commit()
+            print(f"✅ Database schema at revision {head}")
+        finally:
+            if is_mysql and not args.check:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+좋아요 수 보정
+contents_likes에서 컨텐츠별 좋아요 수를 다시 세어 contents.like_count를 바로잡고,
+분산 카운터(content_like_counters) 행을 비웁니다. 컨텐츠 id 순으로 배치 단위로 처리합니다.
+
+Kubernetes CronJob 등으로 주기적으로(예: 하루 한 번, 트래픽이 적은 시간) 실행합니다.
+배치마다 해당 컨텐츠 행을 잠그므로 처리 중인 배치의 좋아요 요청은 잠시 대기합니다.
+
+사용법:
+    python scripts/reconcile_like_counts.py
+    python scripts/reconcile_like_counts.py --batch-size 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.database import engine
+from app.services.like_counter import like_counter
+
+
+async def run(batch_size: int) -> None:
+    try:
+        checked, fixed = await like_counter.reconcile(batch_size)
+        print(f"✅ Checked {checked} contents, corrected {fixed}")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200, help="트랜잭션당 컨텐츠 수 (기본 200)")
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
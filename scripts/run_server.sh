@@ -20,6 +20,9 @@ if [ -f ".env" ]; then
     export $(cat .env | grep -v '^#' | xargs)
 fi
 
+# DB 마이그레이션 (API 서버는 기동 시 스키마 리비전만 확인)
+python3 scripts/migrate.py
+
 # 서버 실행
 echo "Starting Backend server..."
 echo "Host: ${HOST:-0.0.0.0}"